@@ -1,172 +1,373 @@
+import sys
+
+# API Key for OpenWeatherMap
+api_key = "Your_api_key"  #Replace with your api_key
+
+# `python "Weather App.py" --batch Rajkot Gondal` (or --batch -f cities.txt) runs
+# headless for cron jobs: hand off before tkinter and PIL are even imported
+if __name__ == "__main__" and "--batch" in sys.argv[1:]:
+    from weather_batch import main
+    sys.exit(main(sys.argv[1:], default_api_key=api_key))
+
 import tkinter as tk
 from tkinter import messagebox
-from PIL import Image, ImageTk
-import requests
 import datetime
 import os
-import pytz
-from datetime import timezone
-
-def get_city_id(api_key, city_name):
-    api_url = "http://api.openweathermap.org/data/2.5/find"
-    params = {
-        "q": city_name,
-        "appid": api_key
-    }
-    try:
-        response = requests.get(api_url, params=params)
-        response.raise_for_status()
-        data = response.json()
-        if data['count'] > 0:
-            return data['list'][0]['id']
-        else:
-            messagebox.showerror("Error", "City not found.")
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from background_cache import DEFAULT_CACHE_DIR, BackgroundCache
+from metrics import metrics, profile_call
+from rate_limiter import INTERACTIVE, priority
+from refresh_scheduler import RefreshScheduler
+
+# requests, PIL and the data layer are most of the start-up time, so they're
+# imported by load_data_layer once the window is on screen
+icon_cache = None
+
+def load_data_layer():
+    global SHOW_TIMINGS, CityNotFoundError, WeatherAPIError, WeatherError, celsius_to_fahrenheit, city_local_time
+    global fetch_executor, fetch_weather, get_air_quality_data, get_uv_index_data, get_weather_data, summarize_weather
+    global client, icon_cache
+    if icon_cache is not None:
+        return
+    from icon_cache import DEFAULT_ICON_DIR, IconCache
+    from weather_client import client
+    from weather_core import (SHOW_TIMINGS, CityNotFoundError, WeatherAPIError, WeatherError, celsius_to_fahrenheit,
+                              city_local_time, fetch_executor, fetch_weather, get_air_quality_data, get_uv_index_data,
+                              get_weather_data, summarize_weather)
+
+    # Decoded icons stay in memory and their PNGs on disk, so only the first search
+    # that needs a given icon pays for the download and decode
+    icon_cache = IconCache(os.environ.get("WEATHER_APP_ICON_DIR", DEFAULT_ICON_DIR))
+    metrics.add_collector("icons", lambda: icon_cache.stats)
+
+    # Decode whatever icons are already on disk before the first search needs them
+    fetch_executor.submit(icon_cache.prefetch, download=PREFETCH_ICONS)
+
+# Searches run here so the Tk event loop never waits on the network
+search_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="weather-search")
+
+# Auto-refreshes get their own worker: against a slow or failing API one can
+# block for a minute with retries, and it must never hold up a search
+refresh_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="weather-refresh")
+
+# How often the Tk thread checks for finished searches
+RESULT_POLL_MS = 50
+
+# Worker threads never touch widgets: results and error dialogs are queued here
+# as (generation, kind, payload) and handled by poll_results on the Tk thread
+ui_queue = queue.Queue()
+
+# Every search gets a new generation; anything tagged with an older one is stale
+search_generation = 0
+
+def is_stale(generation):
+    return generation != search_generation
+
+def error_dialog(err):
+    # (title, message) in the same wording the app has always used
+    if isinstance(err, CityNotFoundError):
+        return "Error", "City not found."
+    if isinstance(err, WeatherAPIError) and err.status_code is not None:
+        return "HTTP Error", str(err)
+    return "Error", f"An error occurred: {err}"
+
+# Set WEATHER_APP_PREFETCH_ICONS=1 to download all 18 icons in the background at startup
+PREFETCH_ICONS = bool(os.environ.get("WEATHER_APP_PREFETCH_ICONS"))
+
+def icon_loader(generation):
+    # A missing icon is reported but shouldn't cost the user the forecast
+    def load(icon_code):
+        try:
+            return icon_cache.load_image(icon_code)
+        except Exception as err:
+            ui_queue.put((generation, "error", error_dialog(err)))
             return None
-    except requests.exceptions.HTTPError as http_err:
-        messagebox.showerror("HTTP Error", f"HTTP error occurred: {http_err}")
-    except Exception as err:
-        messagebox.showerror("Error", f"An error occurred: {err}")
-    return None
-
-def get_weather_data(api_key, city_id):
-    api_url = "http://api.openweathermap.org/data/2.5/forecast"
-    params = {
-        "id": city_id,
-        "appid": api_key,
-        "units": "metric"
-    }
-    try:
-        response = requests.get(api_url, params=params)
-        response.raise_for_status()
-        data = response.json()
-        return data
-    except requests.exceptions.HTTPError as http_err:
-        messagebox.showerror("HTTP Error", f"HTTP error occurred: {http_err}")
-    except Exception as err:
-        messagebox.showerror("Error", f"An error occurred: {err}")
-    return None
-
-def get_air_quality_data(api_key, lat, lon):
-    api_url = "http://api.openweathermap.org/data/2.5/air_pollution"
-    params = {
-        "lat": lat,
-        "lon": lon,
-        "appid": api_key
-    }
-    try:
-        response = requests.get(api_url, params=params)
-        response.raise_for_status()
-        data = response.json()
-        return data
-    except requests.exceptions.HTTPError as http_err:
-        messagebox.showerror("HTTP Error", f"HTTP error occurred: {http_err}")
-    except Exception as err:
-        messagebox.showerror("Error", f"An error occurred: {err}")
-    return None
-
-def get_uv_index_data(api_key, lat, lon):
-    api_url = "http://api.openweathermap.org/data/2.5/uvi"
-    params = {
-        "lat": lat,
-        "lon": lon,
-        "appid": api_key
-    }
-    try:
-        response = requests.get(api_url, params=params)
-        response.raise_for_status()
-        data = response.json()
-        return data
-    except requests.exceptions.HTTPError as http_err:
-        messagebox.showerror("HTTP Error", f"HTTP error occurred: {http_err}")
-    except Exception as err:
-        messagebox.showerror("Error", f"An error occurred: {err}")
-    return None
+    return load
+
+# While a city is on screen its data is refreshed in the background at these
+# intervals; the refetch is skipped while the cached response is still fresh
+FORECAST_REFRESH_MS = 60 * 60 * 1000
+AIR_QUALITY_REFRESH_MS = 10 * 60 * 1000
+UV_INDEX_REFRESH_MS = 60 * 60 * 1000
+CLOCK_REFRESH_MS = 1000
+
+# A search may be answered from a stale cached response while the cache fetches
+# a fresh one in the background; this soon after, the refreshes look again so
+# the fresh copy reaches the screen instead of waiting for the next interval.
+# Against fresh entries the look is a few cache hits and no request.
+STALE_RECHECK_MS = 2000
+
+# The responses behind what's on screen, so a refresh can swap in just one of them
+current_view = {}
 
+# Last options each widget or canvas item was configured with; set_if_changed skips repeats
+rendered_options = {}
+widget_updates = {"applied": 0, "skipped": 0}
 
-def display_weather_data(data, air_quality_data, uv_index_data):
+def set_if_changed(target, **options):
+    # `target` is a widget, or the id of an item on the main canvas
+    if rendered_options.get(target) == options:
+        widget_updates["skipped"] += 1
+        return
+    if isinstance(target, int):
+        canvas.itemconfigure(target, **options)
+        fit_backdrop(target)
+    else:
+        target.config(**options)
+    rendered_options[target] = options
+    widget_updates["applied"] += 1
+
+
+def display_weather_data(data, air_quality_data, uv_index_data, icon_image=None):
     if data:
-        city_name = data['city']['name']
-        timezone_offset = data['city']['timezone']  # Timezone offset in seconds
-        
-        # Get current UTC time
-        utc_now = datetime.datetime.now(datetime.UTC)
-        
-        # Calculate local time using the timezone offset
-        city_time = utc_now + datetime.timedelta(seconds=timezone_offset)
-        local_time_str = city_time.strftime('%Y-%m-%d %H:%M:%S')
-
-        weather_info = f"City: {city_name}\n"
-        weather_info += f"Current Local Time: {local_time_str}\n"
-        weather_info += f"Temperature (Celsius): {data['list'][0]['main']['temp']}°C\n"
-        weather_info += f"Temperature (Fahrenheit): {(data['list'][0]['main']['temp'] * 9/5) + 32}°F\n"
-        weather_info += f"Humidity: {data['list'][0]['main']['humidity']}%\n"
-        weather_info += f"Pressure: {data['list'][0]['main']['pressure']} hPa\n"
-        weather_info += f"Wind Speed: {data['list'][0]['wind']['speed']} m/s\n"
-        weather_info += f"Weather: {data['list'][0]['weather'][0]['description'].capitalize()}\n"
-
-        high_temp = data['list'][0]['main']['temp']
-        low_temp = data['list'][0]['main']['temp']
-
-        for item in data['list']:
-            if item['main']['temp'] > high_temp:
-                high_temp = item['main']['temp']
-            if item['main']['temp'] < low_temp:
-                low_temp = item['main']['temp']
-
-        weather_info += f"High: {high_temp}°C / {(high_temp * 9/5) + 32}°F\n"
-        weather_info += f"Low: {low_temp}°C / {(low_temp * 9/5) + 32}°F\n"
-        
-        sunrise = datetime.datetime.fromtimestamp(data['city']['sunrise']).strftime('%Y-%m-%d %H:%M:%S')
-        sunset = datetime.datetime.fromtimestamp(data['city']['sunset']).strftime('%Y-%m-%d %H:%M:%S')
-        weather_info += f"Sunrise: {sunrise}\n"
-        weather_info += f"Sunset: {sunset}\n"
-        
-        weather_info += f"UV Index: {uv_index_data['value']}\n"
-        weather_info += f"Air Quality Index: {air_quality_data['list'][0]['main']['aqi']}\n"
-        
-        weather_label.config(text=weather_info)
-        
-        # Display weather icon
-        icon_code = data['list'][0]['weather'][0]['icon']
-        icon_url = f"http://openweathermap.org/img/wn/{icon_code}@2x.png"
-        icon_response = requests.get(icon_url, stream=True)
-        icon_image = Image.open(icon_response.raw)
-        icon_photo = ImageTk.PhotoImage(icon_image)
-        icon_label.config(image=icon_photo)
-        icon_label.image = icon_photo
-  
+        current_view.update(weather_data=data, air_quality_data=air_quality_data,
+                            uv_index_data=uv_index_data, icon_image=icon_image)
+        render_view()
+    else:
+        show_weather_text("Failed to retrieve weather data.")
 
+@metrics.instrument("render_view")
+def render_view():
+    summary = summarize_weather(current_view['weather_data'], current_view['air_quality_data'],
+                                current_view['uv_index_data'])
+    current_view['summary'] = summary
+    show_weather_text(format_weather_info(summary), summary['local_time'])
+    set_if_changed(forecast_text, text=format_daily_summary(summary['daily']))
+
+    # Display weather icon (icon_cache keeps the PhotoImage alive)
+    icon_image = current_view['icon_image']
+    if icon_image is not None:
+        set_if_changed(icon_item, image=icon_cache.photo(summary['icon'], icon_image))
     else:
-        weather_label.config(text="Failed to retrieve weather data.")
+        set_if_changed(icon_item, image="")
+
+def show_weather_text(text, local_time=None):
+    set_if_changed(weather_text, text=text)
+    place_clock()
+    show_local_time(local_time)
+
+def show_local_time(local_time):
+    set_if_changed(clock_text, text="" if local_time is None else f"Current Local Time: {local_time}")
+
+def format_weather_info(summary):
+    # Everything but the local time, which has its own canvas item so the clock tick only redraws that
+    weather_info = f"City: {summary['city']}\n"
+    weather_info += f"Temperature (Celsius): {summary['temp_c']}°C\n"
+    weather_info += f"Temperature (Fahrenheit): {celsius_to_fahrenheit(summary['temp_c'])}°F\n"
+    weather_info += f"Humidity: {summary['humidity']}%\n"
+    weather_info += f"Pressure: {summary['pressure']} hPa\n"
+    weather_info += f"Wind Speed: {summary['wind_speed']} m/s\n"
+    weather_info += f"Weather: {summary['description'].capitalize()}\n"
+    weather_info += f"High: {summary['high_c']}°C / {celsius_to_fahrenheit(summary['high_c'])}°F\n"
+    weather_info += f"Low: {summary['low_c']}°C / {celsius_to_fahrenheit(summary['low_c'])}°F\n"
+
+    sunrise = datetime.datetime.fromtimestamp(summary['sunrise']).strftime('%Y-%m-%d %H:%M:%S')
+    sunset = datetime.datetime.fromtimestamp(summary['sunset']).strftime('%Y-%m-%d %H:%M:%S')
+    weather_info += f"Sunrise: {sunrise}\n"
+    weather_info += f"Sunset: {sunset}\n"
+
+    weather_info += f"UV Index: {summary['uv_index']}\n"
+    weather_info += f"Air Quality Index: {summary['aqi']}\n"
+    return weather_info
+
+def format_daily_summary(days):
+    lines = []
+    for day in days:
+        lines.append(f"{day.date:%a %d %b}  {day.temp.min:.1f} / {day.temp.max:.1f}°C")
+        lines.append(f"  RH {day.humidity.mean:.0f}%  wind {day.wind.mean:.1f} m/s  rain {day.pop.max:.0%}")
+    return "\n".join(lines)
+
+def tick_clock():
+    summary = current_view.get('summary')
+    if summary:
+        summary['local_time'] = city_local_time(summary['timezone'])
+        show_local_time(summary['local_time'])
+
+def refresh_forecast(view):
+    weather_data = get_weather_data(api_key, view['summary']['city_id'], allow_stale=False)
+    if weather_data is view['weather_data']:
+        return None  # still fresh in the cache, nothing new to show
+    icon_code = weather_data.current.icon
+    icon_image = view['icon_image'] if icon_code == view['summary']['icon'] else icon_cache.load_image(icon_code)
+    return {"weather_data": weather_data, "icon_image": icon_image}
+
+def refresh_air_quality(view):
+    city = view['weather_data'].city
+    air_quality_data = get_air_quality_data(api_key, city.lat, city.lon, allow_stale=False)
+    return None if air_quality_data is view['air_quality_data'] else {"air_quality_data": air_quality_data}
+
+def refresh_uv_index(view):
+    city = view['weather_data'].city
+    uv_index_data = get_uv_index_data(api_key, city.lat, city.lon, allow_stale=False)
+    return None if uv_index_data is view['uv_index_data'] else {"uv_index_data": uv_index_data}
+
+def run_refresh(generation, refresh, view):
+    # Runs on the refresh_executor thread. A failed background refresh keeps the
+    # last good data on screen instead of popping a dialog on an unattended display.
+    if is_stale(generation):
+        return  # queued behind a slow one while the user moved on to another city
+    try:
+        updates = refresh(view)
+    except (WeatherError, OSError):
+        return
+    if updates:
+        ui_queue.put((generation, "refresh", updates))
+
+def start_auto_refresh(generation):
+    def submit(refresh):
+        if current_view:
+            refresh_executor.submit(run_refresh, generation, refresh, dict(current_view))
+    def recheck():
+        for refresh in (refresh_forecast, refresh_air_quality, refresh_uv_index):
+            submit(refresh)
+    scheduler.every("clock", CLOCK_REFRESH_MS, tick_clock)
+    scheduler.every("forecast", FORECAST_REFRESH_MS, lambda: submit(refresh_forecast))
+    scheduler.every("air_quality", AIR_QUALITY_REFRESH_MS, lambda: submit(refresh_air_quality))
+    scheduler.every("uv_index", UV_INDEX_REFRESH_MS, lambda: submit(refresh_uv_index))
+    scheduler.once("stale_recheck", STALE_RECHECK_MS, recheck)
+
+def run_search(generation, city_name):
+    # Runs on a search_executor thread. The user is waiting on this one, so its
+    # requests jump the rate limiter queue ahead of background refreshes.
+    try:
+        with priority(INTERACTIVE):
+            result, timings = fetch_weather(api_key, city_name, cancelled=lambda: is_stale(generation),
+                                            icon_loader=icon_loader(generation), icon_saving=icon_cache.saving)
+        if SHOW_TIMINGS:
+            print(f"[icons] {icon_cache.stats}")
+            print(f"[rate limit] {client.limiter.stats}, {client.limiter.usage.today_total()} requests today")
+    except Exception as err:
+        ui_queue.put((generation, "error", error_dialog(err)))
+        result = None
+    ui_queue.put((generation, "result", result))
 
 def search_weather():
+    global search_generation
     city_name = city_entry.get()
     if city_name:
-        city_id = get_city_id(api_key, city_name)
-        if city_id:
-            weather_data = get_weather_data(api_key, city_id)
-            if weather_data:
-                lat = weather_data['city']['coord']['lat']
-                lon = weather_data['city']['coord']['lon']
-                air_quality_data = get_air_quality_data(api_key, lat, lon)
-                uv_index_data = get_uv_index_data(api_key, lat, lon)
-                display_weather_data(weather_data, air_quality_data, uv_index_data)
+        load_data_layer()  # a no-op unless the search beat the first paint
+        search_generation += 1
+        scheduler.cancel_all()
+        current_view.clear()
+        show_weather_text(f"Searching for {city_name}...")
+        search_executor.submit(profile_call, f"search {city_name}", run_search, search_generation, city_name)
 
-# API Key for OpenWeatherMap
-api_key = "Your_api_key"  #Replace with your api_key
+# F12 (or WEATHER_APP_DEBUG_PANEL=1 at startup) opens a window with the live metrics
+DEBUG_PANEL = bool(os.environ.get("WEATHER_APP_DEBUG_PANEL"))
+DEBUG_PANEL_REFRESH_MS = 1000
+debug_panel = None
+debug_label = None
+
+def toggle_debug_panel(event=None):
+    global debug_panel, debug_label
+    if debug_panel is not None:
+        debug_panel.destroy()
+        debug_panel = debug_label = None
+        return
+    debug_panel = tk.Toplevel(root)
+    debug_panel.title("Weather App metrics")
+    debug_panel.protocol("WM_DELETE_WINDOW", toggle_debug_panel)
+    debug_label = tk.Label(debug_panel, text="", justify="left", anchor="nw", font=("Courier", 9))
+    debug_label.pack(fill="both", expand=True)
+    update_debug_panel(debug_label)
+
+def update_debug_panel(label):
+    if label is not debug_label:
+        return  # the panel this loop was drawing has been closed
+    set_if_changed(label, text="\n".join(metrics.summary_lines()) or "No requests yet.")
+    root.after(DEBUG_PANEL_REFRESH_MS, update_debug_panel, label)
+
+def poll_results():
+    while True:
+        try:
+            generation, kind, payload = ui_queue.get_nowait()
+        except queue.Empty:
+            break
+        if is_stale(generation):
+            continue  # a newer search has started; drop whatever the old one produced
+        if kind == "error":
+            messagebox.showerror(*payload)
+        elif kind == "refresh":
+            current_view.update(payload)
+            render_view()
+        elif payload:
+            display_weather_data(*payload)
+            start_auto_refresh(generation)
+        else:
+            show_weather_text("Failed to retrieve weather data.")
+    root.after(RESULT_POLL_MS, poll_results)
+
+# The background is decoded after the window's first paint, at the size the canvas
+# actually has; a resize redraws it once the window has stayed put this long
+RESIZE_DEBOUNCE_MS = 150
+BACKDROP_PADDING = 2
+
+def fit_backdrop(item):
+    # Keep the white box behind a text or icon item the size of what it shows
+    backdrop = backdrops.get(item)
+    if backdrop is None:
+        return
+    empty = canvas.itemcget(item, "image" if canvas.type(item) == "image" else "text") == ""
+    bbox = None if empty else canvas.bbox(item)
+    if bbox is not None and backdrop_boxes.get(backdrop) != bbox:
+        x0, y0, x1, y1 = bbox
+        canvas.coords(backdrop, x0 - BACKDROP_PADDING, y0 - BACKDROP_PADDING, x1 + BACKDROP_PADDING, y1 + BACKDROP_PADDING)
+        backdrop_boxes[backdrop] = bbox
+    set_if_changed(backdrop, state="hidden" if bbox is None else "normal")
+
+def place_clock():
+    # The local time sits on its own line just above the weather text block
+    bbox = canvas.bbox(weather_text)
+    if bbox is not None:
+        canvas.coords(clock_text, (bbox[0] + bbox[2]) // 2, bbox[1] - 2 * BACKDROP_PADDING)
+        fit_backdrop(clock_text)
+
+def layout(width, height):
+    # Same proportions the fixed layout used for the original image size
+    canvas.coords(entry_window, width // 2, height // 8)
+    canvas.coords(button_window, width // 2, height // 8 + 50)
+    canvas.coords(weather_text, width // 2, height // 4 + 135)
+    place_clock()
+    canvas.coords(forecast_text, width - 10, height // 4 + 135)
+    canvas.coords(icon_item, width // 2, height // 2 + 185)
+    for item in backdrops:
+        fit_backdrop(item)
+
+def draw_background(size):
+    if size == canvas_size:  # skip a redraw a later resize has already superseded
+        canvas.itemconfigure(background_item, image=background.photo(size))
+
+def on_canvas_configure(event):
+    global canvas_size
+    size = (event.width, event.height)
+    if size == canvas_size:
+        return
+    canvas_size = size
+    layout(*size)
+    layout_scheduler.once("background", RESIZE_DEBOUNCE_MS, lambda: draw_background(size))
+
+def on_first_expose(event):
+    canvas.unbind("<Expose>")
+    root.after_idle(draw_background, canvas_size)
+    root.after_idle(load_data_layer)
 
 # Create the main window
 root = tk.Tk()
 root.title("Weather App")
+scheduler = RefreshScheduler(root.after, root.after_cancel)
+# Kept apart from `scheduler`, whose jobs every new search cancels
+layout_scheduler = RefreshScheduler(root.after, root.after_cancel)
 
-# Load background image
-bg_image = Image.open("Background_image.jpg")
-bg_photo = ImageTk.PhotoImage(bg_image)
+# Only the image header is read here; the pixels wait for the first paint
+background = BackgroundCache("Background_image.jpg", os.environ.get("WEATHER_APP_RENDER_CACHE", DEFAULT_CACHE_DIR))
+metrics.add_collector("background", lambda: background.stats)
+canvas_size = background.size
 
 # Create a canvas to place the background image
-canvas = tk.Canvas(root, width=bg_image.width, height=bg_image.height)
+canvas = tk.Canvas(root, width=canvas_size[0], height=canvas_size[1], highlightthickness=0)
 canvas.pack(fill="both", expand=True)
-canvas.create_image(0, 0, image=bg_photo, anchor="nw")
+background_item = canvas.create_image(0, 0, anchor="nw")
 
 # Create and place the city entry widget in the middle
 city_entry = tk.Entry(root, width=50, font=("Helvetica", 14))
@@ -182,19 +383,39 @@ def clear_placeholder(event):
 
 city_entry.bind("<FocusIn>", clear_placeholder)
 
-canvas.create_window(bg_image.width // 2, bg_image.height // 8, window=city_entry)
+entry_window = canvas.create_window(0, 0, window=city_entry)
 
 # Create and place the search button below the city entry
 search_button = tk.Button(root, text="Search", command=search_weather, font=("Helvetica", 14))
-canvas.create_window(bg_image.width // 2, bg_image.height // 8 + 50, window=search_button)
+button_window = canvas.create_window(0, 0, window=search_button)
+
+# The weather text, its local time clock, the per-day outlook along the right edge and the icon are
+# canvas items on white backdrops: an update is one itemconfigure, with no
+# Label to re-measure and re-place
+backdrops = {}  # item -> the rectangle behind it
+backdrop_boxes = {}  # rectangle -> bbox it was last fitted to
+
+def create_with_backdrop(kind, **options):
+    backdrop = canvas.create_rectangle(0, 0, 0, 0, fill="white", outline="", state="hidden")
+    item = getattr(canvas, f"create_{kind}")(0, 0, **options)
+    backdrops[item] = backdrop
+    return item
+
+weather_text = create_with_backdrop("text", text="", justify="left", font=("Helvetica", 12))
+clock_text = create_with_backdrop("text", text="", anchor="s", font=("Helvetica", 12))
+forecast_text = create_with_backdrop("text", text="", justify="left", anchor="e", font=("Helvetica", 9))
+icon_item = create_with_backdrop("image", image="")
+
+layout(*canvas_size)
+canvas.bind("<Configure>", on_canvas_configure)
+canvas.bind("<Expose>", on_first_expose)
 
-# Create and place the weather information label in the middle
-weather_label = tk.Label(root, text="", justify="left", anchor="w", bg="white", font=("Helvetica", 12))
-canvas.create_window(bg_image.width // 2, bg_image.height // 4 + 135, window=weather_label)
+root.bind("<F12>", toggle_debug_panel)
+if DEBUG_PANEL:
+    toggle_debug_panel()
 
-# Create and place the weather icon label below the weather information
-icon_label = tk.Label(root, bg="white")
-canvas.create_window(bg_image.width // 2, bg_image.height // 2 +185 , window=icon_label)
+# Start handing finished searches to the widgets
+root.after(RESULT_POLL_MS, poll_results)
 
 # Run the main loop
 root.mainloop()
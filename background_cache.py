@@ -0,0 +1,147 @@
+import glob
+import os
+import struct
+import threading
+from collections import OrderedDict
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "render_cache")
+
+# JPEG start-of-frame markers, which carry the image size (SOF0..SOF15 minus DHT, JPG and DAC)
+JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+def image_size(path):
+    # (width, height) from a JPEG or PNG header without importing PIL, which
+    # the app only loads once its window is up; other formats go through PIL
+    with open(path, "rb") as image_file:
+        head = image_file.read(24)
+        if head.startswith(b"\x89PNG\r\n\x1a\n"):
+            return struct.unpack(">II", head[16:24])
+        if head.startswith(b"\xff\xd8"):
+            image_file.seek(2)
+            while True:
+                marker = image_file.read(2)
+                if len(marker) < 2 or marker[0] != 0xFF:
+                    break
+                length = image_file.read(2)
+                if len(length) < 2:
+                    break
+                if marker[1] in JPEG_SOF_MARKERS:
+                    height, width = struct.unpack(">xHH", image_file.read(5))
+                    return width, height
+                image_file.seek(struct.unpack(">H", length)[0] - 2, os.SEEK_CUR)
+    from PIL import Image
+    with Image.open(path) as header:
+        return header.size
+
+
+class BackgroundCache:
+    # The window background at whatever size the canvas currently has:
+    #   1. scaled PIL images and Tk PhotoImages of the last few sizes, in memory
+    #   2. pre-scaled copies in `cache_dir` stored as uncompressed PPM, which
+    #      load in about a third of the time it takes to decode the JPEG
+    #   3. the source image, decoded in JPEG draft mode when shrinking (the
+    #      decoder skips the detail that would be thrown away) and then scaled
+    # `size` is read from the file header alone, so the window can be laid out
+    # before any pixels are decoded or PIL is imported. image() is safe on
+    # worker threads; photo() must run on the Tk thread.
+
+    def __init__(self, path, cache_dir=DEFAULT_CACHE_DIR, max_variants=4, max_disk_variants=8):
+        self.path = path
+        self.cache_dir = cache_dir
+        self.max_variants = max_variants
+        self.max_disk_variants = max_disk_variants
+        self.size = image_size(path)
+        self._version = os.stat(path).st_mtime_ns  # editing the source invalidates the copies on disk
+        self._images = OrderedDict()
+        self._photos = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "decodes": 0}
+
+    def _stem(self):
+        return os.path.splitext(os.path.basename(self.path))[0]
+
+    def _variant_path(self, size):
+        return os.path.join(self.cache_dir, f"{self._stem()}-{size[0]}x{size[1]}-{self._version}.ppm")
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def image(self, size):
+        with self._lock:
+            image = self._images.get(size)
+            if image is not None:
+                self._images.move_to_end(size)
+                self.stats["memory_hits"] += 1
+                return image
+
+        image = self._load_variant(size)
+        if image is None:
+            image = self._scale(size)
+            self._save_variant(size, image)
+        with self._lock:
+            self._images[size] = image
+            while len(self._images) > self.max_variants:
+                self._images.popitem(last=False)
+        return image
+
+    def _load_variant(self, size):
+        if not self.cache_dir:
+            return None
+        from PIL import Image
+        try:
+            with Image.open(self._variant_path(size)) as variant:
+                variant.load()
+                if variant.size != size:
+                    return None
+                image = variant.copy() if variant.mode == "RGB" else variant.convert("RGB")
+        except OSError:
+            return None
+        self._count("disk_hits")
+        return image
+
+    def _scale(self, size):
+        from PIL import Image, ImageOps
+        with Image.open(self.path) as source:
+            source.draft("RGB", size)  # only JPEG uses this; never decodes smaller than `size`
+            image = source.convert("RGB")
+        if image.size != size:
+            # Cover the whole canvas, cropping whatever doesn't fit the new aspect ratio
+            image = ImageOps.fit(image, size, Image.BILINEAR)
+        self._count("decodes")
+        return image
+
+    def _save_variant(self, size, image):
+        if not self.cache_dir:
+            return
+        path = self._variant_path(size)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            temp_path = f"{path}.{threading.get_ident()}.tmp"
+            image.save(temp_path, format="PPM")
+            os.replace(temp_path, path)
+            self._prune()
+        except OSError:
+            pass  # a read-only install still works, it just decodes the JPEG every start
+
+    def _prune(self):
+        # Keep the most recently written copies; window sizes that aren't used any more age out
+        variants = glob.glob(os.path.join(glob.escape(self.cache_dir), f"{glob.escape(self._stem())}-*.ppm"))
+        variants.sort(key=os.path.getmtime, reverse=True)
+        for stale in variants[self.max_disk_variants:]:
+            os.remove(stale)
+
+    def photo(self, size):
+        photo = self._photos.get(size)
+        if photo is None:
+            from PIL import ImageTk
+            photo = ImageTk.PhotoImage(self.image(size))
+            self._photos[size] = photo
+            # The newest PhotoImage is the one on screen, so it's never the one dropped
+            while len(self._photos) > self.max_variants:
+                self._photos.popitem(last=False)
+        else:
+            self._photos.move_to_end(size)
+            self._count("memory_hits")
+        return photo
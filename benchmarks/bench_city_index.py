@@ -0,0 +1,129 @@
+import gc
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from city_index import CityIndex, build_index, normalize_name, open_city_list
+
+# Lookup latency and resident memory of the offline city index for a city list
+# the size of OpenWeatherMap's (~210k entries). Pass the real city.list.json(.gz)
+# as the first argument, otherwise a synthetic list of the same size is used.
+
+CITY_COUNT = 209_579
+SYLLABLES = ["ra", "jo", "kot", "san", "são", "pau", "lo", "ber", "lin", "mün", "chen", "gon", "dal", "zü", "rich", "los", "an", "ge", "les", "köln"]
+COUNTRIES = ["IN", "BR", "DE", "US", "CH", "GB", "FR", "JP", "MX", "ES"]
+
+
+def resident_memory_mb():
+    # (anonymous, file-backed) resident MB; mmap'd index pages show up as file-backed
+    # and can be dropped by the OS at any time, unlike heap objects
+    try:
+        with open("/proc/self/status") as status:
+            fields = dict(line.split(":", 1) for line in status)
+        return int(fields["RssAnon"].split()[0]) / 1024, int(fields["RssFile"].split()[0]) / 1024
+    except (OSError, KeyError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 0.0
+
+
+def memory_delta(baseline):
+    anon, file_backed = resident_memory_mb()
+    return f"{anon - baseline[0]:.1f} MB heap + {file_backed - baseline[1]:.1f} MB mapped file"
+
+
+def synthetic_city_list(path, count=CITY_COUNT):
+    rng = random.Random(42)
+    cities = []
+    for city_id in range(count):
+        name = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).title()
+        if rng.random() < 0.1:
+            name += " " + rng.choice(SYLLABLES).title()
+        cities.append({
+            "id": city_id + 1,
+            "name": name,
+            "state": "",
+            "country": rng.choice(COUNTRIES),
+            "coord": {"lat": round(rng.uniform(-90, 90), 4), "lon": round(rng.uniform(-180, 180), 4)},
+        })
+    with open(path, "w", encoding="utf-8") as city_list:
+        json.dump(cities, city_list, ensure_ascii=False)
+    return path
+
+
+def time_lookups(func, queries):
+    samples = []
+    for query in queries:
+        start = time.perf_counter()
+        func(query)
+        samples.append((time.perf_counter() - start) * 1e6)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.99)]
+
+
+def sample_names(json_path):
+    return [city["name"] for city in random.Random(7).sample(open_city_list(json_path), 2000)]
+
+
+def bench_index(json_path, index_path):
+    names = sample_names(json_path)
+    gc.collect()
+
+    baseline = resident_memory_mb()
+    start = time.perf_counter()
+    index = CityIndex(index_path)
+    index.lookup(names[0])
+    print(f"sqlite index: first lookup (open + query) {(time.perf_counter() - start) * 1000:.2f} ms")
+    for label, func, queries in (
+        ("exact", index.lookup, names),
+        ("exact, accent/case folded", index.lookup, [normalize_name(name).upper() for name in names]),
+        ("prefix (3 chars)", index.prefix, [name[:3] for name in names]),
+        ("resolve", index.resolve, names),
+    ):
+        median, p99 = time_lookups(func, queries)
+        print(f"  {label:<26} median {median:7.1f} us   p99 {p99:7.1f} us")
+    print(f"  resident memory added: {memory_delta(baseline)}")
+
+
+def bench_dict(json_path):
+    # For comparison: the whole list loaded into a dict keyed on normalized name
+    baseline = resident_memory_mb()
+    start = time.perf_counter()
+    by_name = {}
+    for city in open_city_list(json_path):
+        by_name.setdefault(normalize_name(city["name"]), []).append(city)
+    print(f"in-memory dict: load {(time.perf_counter() - start) * 1000:.0f} ms")
+    gc.collect()
+    print(f"  resident memory held: {memory_delta(baseline)}")
+    names = [cities[0]["name"] for cities in random.Random(7).sample(list(by_name.values()), 2000)]
+    median, p99 = time_lookups(lambda name: by_name.get(normalize_name(name)), names)
+    print(f"  {'exact':<26} median {median:7.1f} us   p99 {p99:7.1f} us")
+
+
+def main():
+    workdir = tempfile.mkdtemp(prefix="city-index-bench-")
+    json_path = sys.argv[1] if len(sys.argv) > 1 else synthetic_city_list(os.path.join(workdir, "city.list.json"))
+    index_path = os.path.join(workdir, "city_index.sqlite3")
+
+    start = time.perf_counter()
+    count = build_index(json_path, index_path)
+    print(f"build: {count} cities in {time.perf_counter() - start:.2f}s, index file {os.path.getsize(index_path) / 2 ** 20:.1f} MB")
+
+    # Each variant runs in a fresh interpreter so neither inherits the other's heap
+    subprocess.run([sys.executable, __file__, "--index", json_path, index_path], check=True)
+    subprocess.run([sys.executable, __file__, "--dict", json_path], check=True)
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--index"]:
+        bench_index(*sys.argv[2:4])
+    elif sys.argv[1:2] == ["--dict"]:
+        bench_dict(sys.argv[2])
+    else:
+        main()
@@ -0,0 +1,74 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stub_server import StubServer
+from weather_client import WeatherClient
+
+# Runs the shared WeatherClient against the local stub and reports how many
+# TCP connections a burst of lookups needed and how many attempts a failing
+# endpoint received before the client gave up. Exits non-zero if the burst
+# needed more than one connection or the attempts don't match max_retries + 1.
+
+
+def connection_reuse(requests_count=50):
+    with StubServer() as stub:
+        client = WeatherClient()
+        start = time.perf_counter()
+        for index in range(requests_count):
+            client.get(f"{stub.api_base_url}/uvi", params={"lat": index, "lon": index}).raise_for_status()
+        elapsed = time.perf_counter() - start
+        client.close()
+        reused = stub.stats["connections"] == 1
+        print(f"connection reuse: {stub.stats['requests']} requests over {stub.stats['connections']} connection(s), "
+              f"{elapsed / requests_count * 1000:.2f} ms/request")
+
+        # Same burst with a fresh connection per request, like bare requests.get
+        import requests
+        stub.reset_stats()
+        start = time.perf_counter()
+        for index in range(requests_count):
+            requests.get(f"{stub.api_base_url}/uvi", params={"lat": index, "lon": index}, timeout=5).raise_for_status()
+        elapsed = time.perf_counter() - start
+        print(f"bare requests.get: {stub.stats['requests']} requests over {stub.stats['connections']} connection(s), "
+              f"{elapsed / requests_count * 1000:.2f} ms/request")
+    return reused
+
+
+def bounded_retries(status, max_retries=3):
+    delays = []
+    with StubServer(fail_first=1000, error_status=status) as stub:
+        client = WeatherClient(max_retries=max_retries, sleep=delays.append)
+        response = client.get(f"{stub.api_base_url}/uvi", params={"lat": 0, "lon": 0})
+        client.close()
+        print(f"HTTP {status}: gave up with {response.status_code} after {stub.stats['requests']} attempt(s) "
+              f"(max_retries={max_retries}), backoff delays {[round(delay, 3) for delay in delays]}")
+        return stub.stats["requests"] == max_retries + 1
+
+
+def recovers_after_transient_errors():
+    with StubServer(fail_first=2, error_status=503) as stub:
+        client = WeatherClient(sleep=lambda delay: None)
+        response = client.get(f"{stub.api_base_url}/uvi", params={"lat": 0, "lon": 0})
+        client.close()
+        print(f"transient 503 x2: final status {response.status_code} after {stub.stats['requests']} attempt(s), client stats {client.stats}")
+        return response.status_code == 200 and stub.stats["requests"] == 3
+
+
+def main():
+    checks = {
+        "one connection for the whole burst": connection_reuse(),
+        "HTTP 503 attempts == max_retries + 1": bounded_retries(503),
+        "HTTP 429 attempts == max_retries + 1": bounded_retries(429),
+        "recovers after two 503s": recovers_after_transient_errors(),
+    }
+    failed = [name for name, passed in checks.items() if not passed]
+    for name in failed:
+        print(f"FAIL: {name}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
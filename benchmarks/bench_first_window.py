@@ -0,0 +1,134 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image
+
+from background_cache import BackgroundCache
+
+# Two parts:
+#  1. Headless: what producing the background costs on each path, from the
+#     full JPEG decode the app used to do before showing its window to a warm
+#     in-memory variant, plus a rescale to a new window size.
+#  2. With a display: time-to-first-window, from launching `python "Weather App.py"`
+#     until its main window is mapped, for this tree and optionally for an
+#     older revision:
+#
+#       python benchmarks/bench_first_window.py --baseline HEAD~1
+#
+# Part 2 patches tkinter.Tk in a wrapper instead of relying on hooks in the
+# app, so any revision can be measured the same way.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKGROUND = os.path.join(ROOT, "Background_image.jpg")
+RUNS = int(os.environ.get("BENCH_RUNS", "10"))
+
+WRAPPER = """
+import os, runpy, sys, time, tkinter
+launched, app = float(sys.argv[1]), sys.argv[2]
+original_init = tkinter.Tk.__init__
+
+def init(self, *args, **kwargs):
+    original_init(self, *args, **kwargs)
+    def mapped(event):
+        if event.widget is self and not getattr(self, "_first_window", False):
+            self._first_window = True
+            print(f"first_window {time.time() - launched:.6f}", flush=True)
+            self.after(200, self.destroy)
+    self.bind("<Map>", mapped, add="+")
+
+tkinter.Tk.__init__ = init
+sys.argv = [app]
+os.chdir(os.path.dirname(app))
+runpy.run_path(app, run_name="__main__")
+"""
+
+
+def best_ms(func, number=20):
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1000
+
+
+def background_paths():
+    size = Image.open(BACKGROUND).size
+    larger = (size[0] * 3 // 2, size[1] * 3 // 2)
+    with tempfile.TemporaryDirectory() as cache_dir:
+        def full_decode():
+            with Image.open(BACKGROUND) as image:
+                image.load()
+
+        def cold(target):
+            for name in os.listdir(cache_dir):
+                os.remove(os.path.join(cache_dir, name))
+            BackgroundCache(BACKGROUND, cache_dir).image(target)
+
+        BackgroundCache(BACKGROUND, cache_dir).image(size)
+        warm = BackgroundCache(BACKGROUND, cache_dir)
+        warm.image(size)
+
+        print(f"background {size[0]}x{size[1]}:")
+        for name, func in (
+            ("JPEG decode (the old start-up path)", full_decode),
+            ("header only (size for the layout)", lambda: BackgroundCache(BACKGROUND, None)),
+            ("cold: decode + write variant", lambda: cold(size)),
+            ("pre-scaled variant from disk", lambda: BackgroundCache(BACKGROUND, cache_dir).image(size)),
+            ("variant in memory", lambda: warm.image(size)),
+            (f"cold rescale to {larger[0]}x{larger[1]}", lambda: cold(larger)),
+            (f"cold rescale to {size[0] // 2}x{size[1] // 2} (draft)", lambda: cold((size[0] // 2, size[1] // 2))),
+        ):
+            print(f"  {name:<42} {best_ms(func):8.2f} ms")
+
+
+def first_window_ms(tree):
+    app = os.path.join(tree, "Weather App.py")
+    with tempfile.TemporaryDirectory() as render_cache:
+        env = dict(os.environ, WEATHER_APP_RENDER_CACHE=render_cache)
+        samples = []
+        for _ in range(RUNS):
+            result = subprocess.run([sys.executable, "-c", WRAPPER, str(time.time()), app], cwd=tree, env=env,
+                                    capture_output=True, text=True, timeout=60)
+            lines = [line for line in result.stdout.splitlines() if line.startswith("first_window ")]
+            if not lines:
+                raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "no window")
+            samples.append(float(lines[0].split()[1]) * 1000)
+    return statistics.median(samples), min(samples)
+
+
+def export_revision(revision, directory):
+    archive = subprocess.run(["git", "archive", revision], cwd=ROOT, check=True, capture_output=True).stdout
+    subprocess.run(["tar", "-x", "-C", directory], input=archive, check=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Background rendering cost and time-to-first-window.")
+    parser.add_argument("--baseline", help="also measure this git revision, e.g. HEAD~1")
+    args = parser.parse_args()
+
+    background_paths()
+
+    if not os.environ.get("DISPLAY") and sys.platform.startswith("linux"):
+        print("time-to-first-window: skipped, no DISPLAY (try xvfb-run)")
+        return
+    print(f"time-to-first-window, median/best of {RUNS} launches (the first one fills the render cache):")
+    trees = [("this tree", ROOT)]
+    with tempfile.TemporaryDirectory() as baseline_dir:
+        if args.baseline:
+            export_revision(args.baseline, baseline_dir)
+            trees.insert(0, (args.baseline, baseline_dir))
+        for label, tree in trees:
+            try:
+                median, best = first_window_ms(tree)
+            except (RuntimeError, subprocess.TimeoutExpired) as err:
+                print(f"  {label:<12} failed: {err}")
+                continue
+            print(f"  {label:<12} {median:8.1f} ms  (best {best:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
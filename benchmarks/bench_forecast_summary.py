@@ -0,0 +1,85 @@
+import json
+import os
+import sys
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from forecast_summary import ForecastColumns, summarize_days
+from stub_server import make_forecast
+
+# The high/low loop display_weather_data used to run, a plain per-item loop
+# computing the same per-day statistics, and the columnar summarizer, for one
+# real-sized forecast (40 slots), a 1,000 city batch, and one long synthetic
+# forecast. Also compares what the parsed dicts and the columns keep alive.
+
+SCENARIOS = [("1 forecast x 40 slots", 1, 40), ("1,000 forecasts x 40 slots", 1000, 40), ("1 forecast x 100,000 slots", 1, 100_000)]
+
+
+def original_high_low(data):
+    high_temp = data['list'][0]['main']['temp']
+    low_temp = data['list'][0]['main']['temp']
+
+    for item in data['list']:
+        if item['main']['temp'] > high_temp:
+            high_temp = item['main']['temp']
+        if item['main']['temp'] < low_temp:
+            low_temp = item['main']['temp']
+    return low_temp, high_temp
+
+
+def per_item_daily(data):
+    offset = data['city']['timezone']
+    days = {}
+    for item in data['list']:
+        day = days.setdefault((item['dt'] + offset) // 86400, {"temp": [], "humidity": [], "wind": [], "pop": []})
+        day["temp"].append(item['main']['temp'])
+        day["humidity"].append(item['main']['humidity'])
+        day["wind"].append(item['wind']['speed'])
+        day["pop"].append(item.get('pop', 0.0))
+    return {
+        key: {name: (min(values), max(values), sum(values) / len(values)) for name, values in day.items()}
+        for key, day in days.items()
+    }
+
+
+def best_of(func, number):
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1000
+
+
+def retained_kb(build):
+    tracemalloc.start()
+    kept = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return size / 1024
+
+
+def main():
+    for label, count, slots in SCENARIOS:
+        forecasts = [make_forecast(1000 + index, slots=slots) for index in range(count)]
+        payloads = [json.dumps(data) for data in forecasts]
+        columns = [ForecastColumns.from_forecast(data) for data in forecasts]
+        for data, built in zip(forecasts, columns):
+            assert built.temperature_range() == original_high_low(data)
+        number = max(1, 20_000 // (count * slots))
+
+        print(label)
+        for name, func in (
+            ("original high/low loop", lambda: [original_high_low(data) for data in forecasts]),
+            ("per-item loop, daily stats", lambda: [per_item_daily(data) for data in forecasts]),
+            ("columns: build + daily stats", lambda: [summarize_days(data) for data in forecasts]),
+            ("columns: build only", lambda: [ForecastColumns.from_forecast(data) for data in forecasts]),
+            ("daily stats on built columns", lambda: [summarize_days(built) for built in columns]),
+        ):
+            print(f"  {name:<30} {best_of(func, number):10.3f} ms")
+
+        dict_kb = retained_kb(lambda: [json.loads(payload) for payload in payloads])
+        column_kb = retained_kb(lambda: [ForecastColumns.from_forecast(json.loads(payload)) for payload in payloads])
+        print(f"  memory kept: parsed dicts {dict_kb:,.0f} KB, columns {column_kb:,.0f} KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import ast
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# Cold-start cost of each way into the app, measured in fresh interpreters:
+#   - headless: what a script or cron job pays to use the data layer
+#   - batch: `python "Weather App.py" --batch --help`, the whole CLI start-up
+#   - GUI imports before the window: the import statements at the top level of
+#     "Weather App.py", read from the file itself so the list can't go stale
+#   - GUI imports after the window: the ones load_data_layer() makes once the
+#     window is on screen, on top of the first set
+#   - original GUI imports: the module-level imports the app used to start with
+# Tk itself needs a display, so window creation isn't included here.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, "Weather App.py")
+RUNS = int(os.environ.get("BENCH_RUNS", "15"))
+
+
+def app_imports():
+    # (top-level import statements, those inside load_data_layer) of the app, as source
+    with open(APP, encoding="utf-8") as app_file:
+        tree = ast.parse(app_file.read())
+    top_level = [ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+    deferred = [ast.unparse(node) for function in tree.body
+                if isinstance(function, ast.FunctionDef) and function.name == "load_data_layer"
+                for node in ast.walk(function) if isinstance(node, (ast.Import, ast.ImportFrom))]
+    return "\n".join(top_level), "\n".join(deferred)
+
+
+BEFORE_WINDOW, AFTER_WINDOW = app_imports()
+
+SCENARIOS = {
+    "headless (import weather_core)": ["-c", "import weather_core"],
+    "batch CLI start-up (--batch --help)": [APP, "--batch", "--help"],
+    "GUI imports before the window": ["-c", BEFORE_WINDOW],
+    "GUI imports, window + data layer": ["-c", f"{BEFORE_WINDOW}\n{AFTER_WINDOW}"],
+    "original GUI imports": ["-c", "import tkinter, tkinter.messagebox, requests, datetime, os, pytz; "
+                                   "from PIL import Image, ImageTk; from datetime import timezone"],
+}
+
+
+def run(args):
+    start = time.perf_counter()
+    subprocess.run([sys.executable, *args], cwd=ROOT, check=True, stdout=subprocess.DEVNULL)
+    return (time.perf_counter() - start) * 1000
+
+
+def imported_modules(args):
+    # -X importtime lists every module the scenario pulls in
+    if args[0] != "-c":
+        return None
+    result = subprocess.run([sys.executable, "-X", "importtime", *args], cwd=ROOT, capture_output=True, text=True)
+    return sum(1 for line in result.stderr.splitlines() if line.startswith("import time:")) - 1
+
+
+def main():
+    baseline = statistics.median(run(["-c", "pass"]) for _ in range(RUNS))
+    print(f"interpreter start-up: {baseline:.1f} ms (median of {RUNS}), subtracted below")
+    for name, args in SCENARIOS.items():
+        try:
+            samples = [run(args) - baseline for _ in range(RUNS)]
+        except subprocess.CalledProcessError:
+            print(f"{name:<38} skipped (missing dependency)")
+            continue
+        modules = imported_modules(args)
+        modules = f"{modules} modules" if modules is not None else ""
+        print(f"{name:<38} median {statistics.median(samples):7.1f} ms   min {min(samples):7.1f} ms   {modules}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import bisect
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rate_limiter import BACKGROUND, INTERACTIVE, RateLimiter, UsageCounter
+
+# Two parts:
+#  1. Simulated minutes on a fake clock: 200 requests against a 60/min limiter
+#     with a burst of 10. No real waiting, and the same numbers every run;
+#     exits non-zero if any 60 s window saw more than 60 requests.
+#  2. Real threads: a batch of background requests is already queued when an
+#     interactive search asks for a token; reports how long each lane waited.
+
+RPM = 600  # fast enough that part 2 finishes in a few seconds
+BURST = 2
+BACKGROUND_REQUESTS = 30
+
+
+def busiest_minute(started):
+    # Most requests starting within any 60 s window
+    return max(bisect.bisect_left(started, start + 60) - index for index, start in enumerate(started))
+
+
+def simulated_minute():
+    now = [0.0]
+    limiter = RateLimiter(60, burst=10, clock=lambda: now[0],
+                          wait=lambda condition, timeout: now.__setitem__(0, now[0] + timeout),
+                          usage=UsageCounter(today=lambda: "1970-01-01"))
+    started = [now[0] + limiter.acquire() for _ in range(200)]
+    busiest = busiest_minute(started)
+    print(f"simulated: 200 requests at 60/min, burst 10 -> last one starts at t={started[-1]:.1f}s, "
+          f"{sum(start < 60 for start in started)} in the first minute, at most {busiest} in any 60 s, "
+          f"usage {limiter.usage.usage['total']}")
+    return busiest <= 60
+
+
+def lane_waits():
+    limiter = RateLimiter(RPM, burst=BURST, usage=UsageCounter())
+    waits = {INTERACTIVE: [], BACKGROUND: []}
+
+    def request(lane):
+        waits[lane].append(limiter.acquire(lane))
+
+    threads = [threading.Thread(target=request, args=(BACKGROUND,)) for _ in range(BACKGROUND_REQUESTS)]
+    for thread in threads:
+        thread.start()
+    while limiter.queue_length() < BACKGROUND_REQUESTS - BURST:
+        time.sleep(0.001)
+    interactive = threading.Thread(target=request, args=(INTERACTIVE,))
+    interactive.start()
+    for thread in threads + [interactive]:
+        thread.join()
+
+    background = sorted(waits[BACKGROUND])
+    print(f"threads: {BACKGROUND_REQUESTS} background requests queued at {RPM}/min, then 1 interactive")
+    print(f"  interactive waited {waits[INTERACTIVE][0] * 1000:.0f} ms")
+    print(f"  background waited median {background[len(background) // 2] * 1000:.0f} ms, "
+          f"max {background[-1] * 1000:.0f} ms")
+    print(f"  {limiter.stats}")
+
+
+def main():
+    if not simulated_minute():
+        print("FAIL: more than 60 requests in a 60 s window", file=sys.stderr)
+        return 1
+    lane_waits()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+import json
+import os
+import sys
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stub_server import make_air_quality, make_forecast, make_uv_index
+from weather_records import STREAM_CHUNK_SIZE, parse_air_quality, parse_forecast, parse_uv_index
+
+# The /forecast, /air_pollution and /uvi bodies of 1 and 1,000 cities, decoded
+# the way response.json() does (the whole body into one dict tree) and streamed
+# into weather_records in STREAM_CHUNK_SIZE chunks, the way fetch_json reads
+# them. Reports parse time and, with every city's result kept as a batch run
+# would, peak and retained traced memory.
+
+CITY_COUNTS = [1, 1000]
+
+
+def make_bodies(count):
+    bodies = []
+    for index in range(count):
+        forecast = make_forecast(1000 + index)
+        lat, lon = forecast["city"]["coord"]["lat"], forecast["city"]["coord"]["lon"]
+        bodies.append(tuple(json.dumps(data).encode() for data in
+                            (forecast, make_air_quality(lat, lon), make_uv_index(lat, lon))))
+    return bodies
+
+
+def chunked(body):
+    return (body[start:start + STREAM_CHUNK_SIZE] for start in range(0, len(body), STREAM_CHUNK_SIZE))
+
+
+def parse_dicts(bodies):
+    # requests' response.json(): decode the text, then json.loads all of it
+    return [tuple(json.loads(body.decode("utf-8")) for body in city) for city in bodies]
+
+
+def parse_records(bodies):
+    return [(parse_forecast(chunked(forecast)), parse_air_quality(chunked(air_quality)), parse_uv_index(chunked(uv_index)))
+            for forecast, air_quality, uv_index in bodies]
+
+
+def traced_kb(parse, bodies):
+    tracemalloc.start()
+    kept = parse(bodies)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return peak / 1024, retained / 1024
+
+
+def main():
+    for count in CITY_COUNTS:
+        bodies = make_bodies(count)
+        size_kb = sum(map(len, (body for city in bodies for body in city))) / 1024
+        number = max(1, 200 // count)
+        print(f"{count:,} cities, {size_kb:,.0f} KB of JSON")
+        for name, parse in (("response.json() dicts", parse_dicts), ("streamed records", parse_records)):
+            seconds = min(timeit.repeat(lambda: parse(bodies), number=number, repeat=5)) / number
+            peak_kb, retained_kb = traced_kb(parse, bodies)
+            print(f"  {name:<22} {seconds * 1000:9.2f} ms   peak {peak_kb:9,.0f} KB   kept {retained_kb:9,.0f} KB")
+
+
+if __name__ == "__main__":
+    main()
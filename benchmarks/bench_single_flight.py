@@ -0,0 +1,79 @@
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stub_server import StubServer
+
+# Synthetic burst against the local stub: many threads released at once ask for
+# the same forecast and for AQI/UV at points a few hundred metres apart, the way
+# repeated Search clicks or batch workers covering neighbouring sites do.
+# Reports how many upstream requests reached the stub with and without
+# single-flight coalescing.
+
+THREADS = 64
+LATENCY = 0.2
+CITY_ID = 1259229
+LAT, LON = 22.3039, 70.8022
+
+
+class NoCoalescing:
+    stats = {}
+
+    def do(self, key, func):
+        return func()
+
+
+def burst(weather_core, seed=1):
+    rng = random.Random(seed)
+    jobs = []
+    for index in range(THREADS):
+        lat, lon = LAT + rng.uniform(-0.002, 0.002), LON + rng.uniform(-0.002, 0.002)
+        jobs.append([
+            lambda: weather_core.get_weather_data("key", CITY_ID),
+            lambda lat=lat, lon=lon: weather_core.get_air_quality_data("key", lat, lon),
+            lambda lat=lat, lon=lon: weather_core.get_uv_index_data("key", lat, lon),
+        ][index % 3])
+
+    barrier = threading.Barrier(len(jobs))
+    errors = []
+
+    def run(job):
+        barrier.wait()
+        try:
+            job()
+        except Exception as err:
+            errors.append(err)
+
+    threads = [threading.Thread(target=run, args=(job,)) for job in jobs]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start, errors
+
+
+def main():
+    with StubServer(latency=LATENCY) as stub:
+        os.environ["OWM_API_BASE_URL"] = stub.api_base_url
+        import weather_core
+        weather_core.client.limiter = None  # the stub has no quota to protect
+
+        coalescing = weather_core.single_flight
+        for label, flight in (("without coalescing", NoCoalescing()), ("with single-flight", coalescing)):
+            weather_core.single_flight = flight
+            weather_core.response_cache.clear()
+            stub.reset_stats()
+            elapsed, errors = burst(weather_core)
+            print(f"{label:<20} {THREADS} lookups -> {stub.stats['requests']:3d} upstream requests "
+                  f"in {elapsed * 1000:.0f} ms{f', {len(errors)} errors' if errors else ''}")
+        print(f"single-flight counters: {coalescing.stats} "
+              f"({coalescing.stats['shared']} upstream calls saved)")
+
+
+if __name__ == "__main__":
+    main()
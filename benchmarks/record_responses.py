@@ -0,0 +1,80 @@
+import argparse
+import os
+import sys
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stub_server import recording_name
+
+# Captures real /find, /forecast, /air_pollution, /uvi and icon responses for
+# the given cities into a directory the stub can serve with --recordings, so
+# benchmarks run offline against the payloads the API actually sends:
+#
+#   python benchmarks/record_responses.py --api-key KEY Rajkot Gondal "London,GB"
+#   python benchmarks/run_benchmarks.py --recordings benchmarks/recordings
+#
+# The first city's responses are also saved as each endpoint's default.json,
+# which the stub serves for any city that wasn't recorded.
+
+API_BASE_URL = "https://api.openweathermap.org/data/2.5"
+ICON_BASE_URL = "https://openweathermap.org/img/wn"
+COORD_PRECISION = 2  # same rounding as weather_core, so the stub finds the files under the same name
+
+
+def save(directory, path, params, body, default=False):
+    names = [recording_name(path, params)]
+    if default:
+        names.append(os.path.join(os.path.dirname(names[0]), "default.json"))
+    for name in names:
+        target = os.path.join(directory, name)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, "wb") as recording:
+            recording.write(body)
+
+
+def record_city(session, args, city_name, default):
+    def get(base_url, endpoint, params):
+        response = session.get(f"{base_url}/{endpoint}", params=params, timeout=10)
+        response.raise_for_status()
+        path = f"/data/2.5/{endpoint}" if base_url == args.base_url else f"/img/wn/{endpoint}"
+        save(args.output, path, {name: str(value) for name, value in params.items()}, response.content,
+             default and base_url == args.base_url)
+        return response
+
+    found = get(args.base_url, "find", {"q": city_name, "appid": args.api_key}).json()
+    if not found["count"]:
+        print(f"{city_name}: not found", file=sys.stderr)
+        return False
+    forecast = get(args.base_url, "forecast", {"id": found["list"][0]["id"], "appid": args.api_key, "units": "metric"}).json()
+    coord = {"lat": round(forecast["city"]["coord"]["lat"], COORD_PRECISION),
+             "lon": round(forecast["city"]["coord"]["lon"], COORD_PRECISION)}
+    get(args.base_url, "air_pollution", dict(coord, appid=args.api_key))
+    get(args.base_url, "uvi", dict(coord, appid=args.api_key))
+    get(args.icon_base_url, f"{forecast['list'][0]['weather'][0]['icon']}@2x.png", {})
+    print(f"{city_name}: recorded")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record OpenWeatherMap responses for the benchmark stub.")
+    parser.add_argument("cities", nargs="+")
+    parser.add_argument("--api-key", default=os.environ.get("OWM_API_KEY"), required="OWM_API_KEY" not in os.environ)
+    parser.add_argument("--base-url", default=API_BASE_URL)
+    parser.add_argument("--icon-base-url", default=ICON_BASE_URL)
+    parser.add_argument("-o", "--output", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "recordings"))
+    args = parser.parse_args()
+
+    recorded = 0
+    with requests.Session() as session:
+        for city_name in args.cities:
+            try:
+                recorded += record_city(session, args, city_name, default=not recorded)
+            except requests.exceptions.RequestException as err:
+                print(f"{city_name}: {err}", file=sys.stderr)
+    return 0 if recorded else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,154 @@
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stub_server import StubServer
+
+# End-to-end scenarios against the local stub, each in a fresh interpreter so
+# caches and peak memory start from zero:
+#
+#   single_search      one cold fetch_weather with its icon, as the Search button does
+#   repeated_searches  5 cities searched 4 times each (cache and single-flight)
+#   batch_100          100 cities through weather_batch's per-city fetch
+#   batch_1000         the same with 1,000 cities
+#
+# For each: wall time, requests the stub received and peak RSS. Save a run with
+# --save and compare a later one against it with --compare:
+#
+#   python benchmarks/run_benchmarks.py --save before.json
+#   python benchmarks/run_benchmarks.py --compare before.json
+#
+# The rate limiter is switched off, since the stub has no quota to protect.
+# Searches load icons through an IconCache on an empty temporary directory, and
+# the offline city index is pointed at a path that doesn't exist, so a
+# generated city_index.sqlite3 in the repo can't quietly remove the /find calls.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCENARIOS = ["single_search", "repeated_searches", "batch_100", "batch_1000"]
+BATCH_WORKERS = 4
+
+
+def peak_rss_kb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss  # KB on Linux
+
+
+def run_batch(count):
+    from concurrent.futures import ThreadPoolExecutor
+
+    from weather_batch import fetch_city_row
+
+    with ThreadPoolExecutor(max_workers=BATCH_WORKERS) as executor:
+        rows = list(executor.map(lambda index: fetch_city_row("bench", f"Bench City {index:04d}"), range(count)))
+    return sum(row["error"] is not None for row in rows)
+
+
+def run_scenario(name, icon_dir):
+    # Runs in the child interpreter; returns the number of failed lookups
+    import weather_core
+    from icon_cache import IconCache
+    weather_core.client.limiter = None
+    icons = IconCache(icon_dir)
+
+    def search(city_name):
+        result, _ = weather_core.fetch_weather("bench", city_name, icon_loader=icons.load_image,
+                                               icon_saving=icons.saving)
+        return result is None or result[3] is None
+
+    if name == "single_search":
+        return int(search("Rajkot"))
+    if name == "repeated_searches":
+        failures = 0
+        for _ in range(4):
+            for city_name in ("Rajkot", "Gondal", "London", "Tokyo", "Lima"):
+                failures += search(city_name)
+        return failures
+    if name.startswith("batch_"):
+        return run_batch(int(name[len("batch_"):]))
+    raise ValueError(f"unknown scenario {name}")
+
+
+def child(name):
+    import icon_cache, weather_core  # imported before the clock starts, like an app that's already running
+    baseline_kb = peak_rss_kb()
+    with tempfile.TemporaryDirectory() as icon_dir:
+        start = time.perf_counter()
+        try:
+            failures = run_scenario(name, icon_dir)
+        except weather_core.WeatherError:
+            failures = -1
+        wall_seconds = time.perf_counter() - start
+    print(json.dumps({"wall_seconds": wall_seconds, "failures": failures,
+                      "peak_rss_kb": peak_rss_kb(), "start_rss_kb": baseline_kb}))
+
+
+def measure(stub, name):
+    stub.reset_stats()
+    env = dict(os.environ, OWM_API_BASE_URL=stub.api_base_url, OWM_ICON_BASE_URL=stub.icon_base_url)
+    env.pop("WEATHER_APP_CACHE_FILE", None)  # always start cold
+    env["WEATHER_APP_CITY_INDEX"] = os.path.join(ROOT, "benchmarks", "no-city-index.sqlite3")  # never created
+    output = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", name], cwd=ROOT, env=env,
+                            check=True, capture_output=True, text=True).stdout
+    result = json.loads(output.splitlines()[-1])
+    result["requests"] = stub.stats["requests"]
+    result["errors_injected"] = stub.stats["errors"]
+    return result
+
+
+def format_change(new, old):
+    if not old:
+        return ""
+    return f" ({(new - old) / old:+.0%})"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the end-to-end benchmark scenarios against the local stub.")
+    parser.add_argument("scenarios", nargs="*", help=f"any of {', '.join(SCENARIOS)} (default: all)")
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds the stub adds to every response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 503")
+    parser.add_argument("--recordings", help="serve recorded responses from this directory (see record_responses.py)")
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="show changes against results saved with --save")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child)
+        return
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(sorted(unknown))}")
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)["results"]
+
+    results = {}
+    with StubServer(latency=args.latency, error_rate=args.error_rate, seed=1, recordings=args.recordings) as stub:
+        print(f"stub latency {args.latency * 1000:.0f} ms, error rate {args.error_rate:.0%}"
+              f"{', recorded responses' if args.recordings else ''}")
+        for name in args.scenarios or SCENARIOS:
+            result = results[name] = measure(stub, name)
+            old = baseline.get(name, {})
+            line = (f"  {name:<18} {result['wall_seconds'] * 1000:9.0f} ms{format_change(result['wall_seconds'], old.get('wall_seconds'))}"
+                    f"  {result['requests']:5d} requests{format_change(result['requests'], old.get('requests'))}"
+                    f"  peak RSS {result['peak_rss_kb'] / 1024:6.1f} MB{format_change(result['peak_rss_kb'], old.get('peak_rss_kb'))}")
+            if result["failures"]:
+                line += f"  {result['failures']} failed"
+            print(line)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as results_file:
+            json.dump({"latency": args.latency, "error_rate": args.error_rate, "recordings": args.recordings,
+                       "results": results}, results_file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,328 @@
+import hashlib
+import json
+import os
+import random
+import sys
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, urlparse
+
+# Local stand-in for api.openweathermap.org. Answers /find, /forecast,
+# /air_pollution, /uvi and icon requests with deterministic payloads shaped
+# like the real API, and can inject latency and 429/5xx errors.
+#
+#   with StubServer(latency=0.05) as stub:
+#       os.environ["OWM_API_BASE_URL"] = stub.api_base_url
+#       os.environ["OWM_ICON_BASE_URL"] = stub.icon_base_url
+#
+# With `recordings` set to a directory written by record_responses.py, real
+# captured bodies are served instead. A request that wasn't recorded gets its
+# endpoint's default.json with the city ID, name and coordinates swapped for
+# the synthetic ones, so a 1,000 city batch still sees 1,000 distinct cities
+# in real-sized payloads. Without a default, the synthetic payload is served.
+
+ICON_CODES = [f"{code:02d}{part}" for code in (1, 2, 3, 4, 9, 10, 11, 13, 50) for part in "dn"]
+
+
+def city_seed(value):
+    return int(hashlib.md5(str(value).lower().encode("utf-8")).hexdigest()[:8], 16)
+
+
+def make_city(city_name):
+    seed = city_seed(city_name)
+    return {
+        "id": seed % 10_000_000,
+        "name": city_name.title(),
+        "coord": {"lat": round((seed % 18000) / 100 - 90, 4), "lon": round((seed % 36000) / 100 - 180, 4)},
+        "country": "XX",
+    }
+
+
+def make_forecast(city_id, slots=40):
+    rng = random.Random(city_id)
+    start = 1_700_000_000 - 1_700_000_000 % 10800
+    timezone_offset = rng.choice(range(-43200, 50401, 1800))
+    items = []
+    base_temp = rng.uniform(-10, 35)
+    for index in range(slots):
+        temp = round(base_temp + rng.uniform(-6, 6), 2)
+        items.append({
+            "dt": start + index * 10800,
+            "main": {
+                "temp": temp,
+                "feels_like": round(temp - rng.uniform(0, 3), 2),
+                "temp_min": temp,
+                "temp_max": temp,
+                "pressure": rng.randint(990, 1030),
+                "sea_level": rng.randint(990, 1030),
+                "grnd_level": rng.randint(950, 1020),
+                "humidity": rng.randint(10, 100),
+                "temp_kf": 0,
+            },
+            "weather": [{"id": 800, "main": "Clear", "description": "clear sky", "icon": rng.choice(ICON_CODES)}],
+            "clouds": {"all": rng.randint(0, 100)},
+            "wind": {"speed": round(rng.uniform(0, 15), 2), "deg": rng.randint(0, 359), "gust": round(rng.uniform(0, 20), 2)},
+            "visibility": 10000,
+            "pop": round(rng.random(), 2),
+            "sys": {"pod": "d"},
+            "dt_txt": time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(start + index * 10800)),
+        })
+    return {
+        "cod": "200",
+        "message": 0,
+        "cnt": slots,
+        "list": items,
+        "city": {
+            "id": city_id,
+            "name": f"City {city_id}",
+            "coord": {"lat": round(rng.uniform(-90, 90), 4), "lon": round(rng.uniform(-180, 180), 4)},
+            "country": "XX",
+            "population": rng.randint(1000, 5_000_000),
+            "timezone": timezone_offset,
+            "sunrise": start + 6 * 3600,
+            "sunset": start + 18 * 3600,
+        },
+    }
+
+
+def make_air_quality(lat, lon):
+    rng = random.Random(f"{lat},{lon}")
+    return {
+        "coord": {"lon": float(lon), "lat": float(lat)},
+        "list": [{
+            "main": {"aqi": rng.randint(1, 5)},
+            "components": {name: round(rng.uniform(0, 100), 2) for name in ("co", "no", "no2", "o3", "so2", "pm2_5", "pm10", "nh3")},
+            "dt": 1_700_000_000,
+        }],
+    }
+
+
+def make_uv_index(lat, lon):
+    rng = random.Random(f"uv{lat},{lon}")
+    return {"lat": float(lat), "lon": float(lon), "date_iso": "2023-11-14T12:00:00Z", "date": 1_700_000_000, "value": round(rng.uniform(0, 11), 2)}
+
+
+def recording_name(path, params):
+    # File under a recordings directory that holds the response to this request
+    if path.startswith("/img/wn/"):
+        return os.path.join("icons", path[len("/img/wn/"):])
+    endpoint = path.rstrip("/").rsplit("/", 1)[-1]
+    if endpoint == "find":
+        key = " ".join(params["q"].split()).lower()
+    elif endpoint == "forecast":
+        key = params["id"]
+    else:
+        key = f"{params['lat']},{params['lon']}"
+    return os.path.join(endpoint, f"{quote(key, safe='')}.json")
+
+
+def fill_template(path, params, template):
+    # A recorded default response made to look like the answer to this request
+    data = json.loads(template)
+    if path.endswith("/find"):
+        city = make_city(params["q"])
+        data["list"][0].update(id=city["id"], name=city["name"], coord=city["coord"])
+    elif path.endswith("/forecast"):
+        synthetic = make_forecast(int(params["id"]), slots=0)["city"]
+        data["city"].update(id=synthetic["id"], name=synthetic["name"], coord=synthetic["coord"])
+    elif path.endswith("/air_pollution"):
+        data["coord"] = {"lon": float(params["lon"]), "lat": float(params["lat"])}
+    else:
+        data.update(lat=float(params["lat"]), lon=float(params["lon"]))
+    return json.dumps(data).encode()
+
+
+def make_icon_png(icon_code):
+    # A valid 100x100 RGBA PNG built with zlib alone, so the stub doesn't need PIL
+    seed = city_seed(icon_code)
+    pixel = bytes([seed & 0xFF, (seed >> 8) & 0xFF, (seed >> 16) & 0xFF, 255])
+    raw = b"".join(b"\x00" + pixel * 100 for _ in range(100))
+
+    def chunk(kind, data):
+        return len(data).to_bytes(4, "big") + kind + data + zlib.crc32(kind + data).to_bytes(4, "big")
+
+    header = (100).to_bytes(4, "big") * 2 + bytes([8, 6, 0, 0, 0])
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(raw)) + chunk(b"IEND", b"")
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so clients can reuse connections
+    disable_nagle_algorithm = True  # headers and body go out in separate writes
+
+    def setup(self):
+        super().setup()
+        self.server.stub.record("connections")
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        stub = self.server.stub
+        url = urlparse(self.path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        stub.record("requests", url.path)
+
+        if stub.latency:
+            time.sleep(stub.latency)
+
+        status = stub.injected_status()
+        if status is not None:
+            self.send_body(status, json.dumps({"cod": status, "message": "injected error"}).encode(), "application/json",
+                           {"Retry-After": "0"} if status == 429 else None)
+            return
+
+        try:
+            body, content_type = stub.route(url.path, params)
+        except KeyError:
+            self.send_body(404, b'{"cod": "404", "message": "not found"}', "application/json")
+            return
+        self.send_body(200, body, content_type)
+
+    def send_body(self, status, body, content_type, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class StubHTTPServer(ThreadingHTTPServer):
+    request_queue_size = 128  # the default backlog of 5 stalls bursts of concurrent clients
+
+    def handle_error(self, request, client_address):
+        # A client exiting with an idle keep-alive connection open is not worth a traceback
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class StubServer:
+
+    def __init__(self, latency=0.0, error_rate=0.0, error_status=503, fail_first=0, seed=0, host="127.0.0.1", port=0,
+                 recordings=None):
+        self.latency = latency
+        self.recordings = recordings
+        self._recorded = {}  # file name -> body, or None when there's no such file
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.fail_first = fail_first
+        self.random = random.Random(seed)
+        self.stats = {"requests": 0, "connections": 0, "errors": 0, "by_path": {}}
+        self._lock = threading.Lock()
+        self._httpd = StubHTTPServer((host, port), StubHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.stub = self
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def api_base_url(self):
+        return f"{self.base_url}/data/2.5"
+
+    @property
+    def icon_base_url(self):
+        return f"{self.base_url}/img/wn"
+
+    def record(self, name, path=None):
+        with self._lock:
+            self.stats[name] += 1
+            if path is not None:
+                self.stats["by_path"][path] = self.stats["by_path"].get(path, 0) + 1
+
+    def reset_stats(self):
+        with self._lock:
+            self.stats = {"requests": 0, "connections": 0, "errors": 0, "by_path": {}}
+
+    def injected_status(self):
+        with self._lock:
+            if self.fail_first > 0:
+                self.fail_first -= 1
+            elif not (self.error_rate and self.random.random() < self.error_rate):
+                return None
+            self.stats["errors"] += 1
+            return self.error_status
+
+    def recorded(self, path, params):
+        try:
+            name = recording_name(path, params)
+        except KeyError:
+            return None
+        body = self._read_recording(name)
+        if body is not None:
+            return body, "image/png" if name.endswith(".png") else "application/json"
+        if name.startswith("icons"):
+            return None
+        template = self._read_recording(os.path.join(os.path.dirname(name), "default.json"))
+        if template is None:
+            return None
+        return fill_template(path, params, template), "application/json"
+
+    def _read_recording(self, name):
+        if name not in self._recorded:
+            try:
+                with open(os.path.join(self.recordings, name), "rb") as recording:
+                    self._recorded[name] = recording.read()
+            except OSError:
+                self._recorded[name] = None
+        return self._recorded[name]
+
+    def route(self, path, params):
+        if self.recordings:
+            recorded = self.recorded(path, params)
+            if recorded is not None:
+                return recorded
+        if path.endswith("/find"):
+            city = make_city(params["q"])
+            return json.dumps({"message": "accurate", "cod": "200", "count": 1, "list": [city]}).encode(), "application/json"
+        if path.endswith("/forecast"):
+            return json.dumps(make_forecast(int(params["id"]))).encode(), "application/json"
+        if path.endswith("/air_pollution"):
+            return json.dumps(make_air_quality(params["lat"], params["lon"])).encode(), "application/json"
+        if path.endswith("/uvi"):
+            return json.dumps(make_uv_index(params["lat"], params["lon"])).encode(), "application/json"
+        if path.startswith("/img/wn/") and path.endswith("@2x.png"):
+            return make_icon_png(path[len("/img/wn/"):-len("@2x.png")]), "image/png"
+        raise KeyError(path)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="owm-stub", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve fake OpenWeatherMap responses locally.")
+    parser.add_argument("--port", type=int, default=8800)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with --error-status")
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--recordings", help="serve responses captured by record_responses.py from this directory")
+    args = parser.parse_args()
+
+    stub = StubServer(latency=args.latency, error_rate=args.error_rate, error_status=args.error_status, port=args.port,
+                      recordings=args.recordings)
+    print(f"OWM_API_BASE_URL={stub.api_base_url}")
+    print(f"OWM_ICON_BASE_URL={stub.icon_base_url}")
+    try:
+        stub._httpd.serve_forever()
+    except KeyboardInterrupt:
+        stub._httpd.server_close()
@@ -0,0 +1,145 @@
+import gzip
+import json
+import os
+import sqlite3
+import threading
+import unicodedata
+
+# Offline name -> ID lookup built from OpenWeatherMap's bulk city list
+# (http://bulk.openweathermap.org/sample/city.list.json.gz). The JSON is
+# converted once into a small SQLite file:
+#
+#   python city_index.py city.list.json.gz [city_index.sqlite3]
+#
+# and lookups then go straight to an indexed, memory-mapped table instead of
+# the /find endpoint. Nothing is read until the first lookup.
+
+DEFAULT_INDEX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "city_index.sqlite3")
+MMAP_SIZE = 256 * 1024 * 1024
+
+
+def normalize_name(name):
+    # "  São   Paulo " -> "sao paulo"
+    decomposed = unicodedata.normalize("NFKD", name)
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(stripped.casefold().split())
+
+
+def split_query(query):
+    # OWM style "City", "City,CC" or "City,State,CC"
+    parts = [part.strip() for part in query.split(",")]
+    name = parts[0]
+    country = parts[-1].upper() if len(parts) > 1 and parts[-1] else None
+    state = parts[1].upper() if len(parts) > 2 and parts[1] else None
+    return name, state, country
+
+
+def open_city_list(json_path):
+    opener = gzip.open if json_path.endswith(".gz") else open
+    with opener(json_path, "rt", encoding="utf-8") as city_list:
+        return json.load(city_list)
+
+
+def build_index(json_path, index_path=DEFAULT_INDEX_PATH):
+    cities = open_city_list(json_path)
+    temp_path = f"{index_path}.tmp"
+    if os.path.exists(temp_path):
+        os.remove(temp_path)
+    db = sqlite3.connect(temp_path)
+    db.execute("PRAGMA journal_mode = OFF")
+    db.execute("PRAGMA synchronous = OFF")
+    db.execute(
+        "CREATE TABLE cities (key TEXT NOT NULL, id INTEGER NOT NULL, name TEXT NOT NULL, "
+        "state TEXT, country TEXT, lat REAL, lon REAL)"
+    )
+    db.executemany(
+        "INSERT INTO cities VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (
+            (normalize_name(city["name"]), city["id"], city["name"], city.get("state") or None,
+             city.get("country") or None, city["coord"]["lat"], city["coord"]["lon"])
+            for city in cities
+        ),
+    )
+    db.execute("CREATE INDEX cities_by_key ON cities (key, country)")
+    db.commit()
+    db.execute("VACUUM")
+    db.close()
+    os.replace(temp_path, index_path)
+    return len(cities)
+
+
+class CityIndex:
+
+    def __init__(self, index_path=DEFAULT_INDEX_PATH):
+        self.index_path = index_path
+        self._local = threading.local()  # one read-only connection per thread
+        self.stats = {"hits": 0, "ambiguous": 0, "misses": 0}
+
+    def available(self):
+        return os.path.exists(self.index_path)
+
+    def _connection(self):
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(f"file:{self.index_path}?mode=ro", uri=True)
+            db.execute(f"PRAGMA mmap_size = {MMAP_SIZE}")
+            self._local.db = db
+        return db
+
+    def _select(self, where, args, limit):
+        rows = self._connection().execute(
+            f"SELECT id, name, state, country, lat, lon FROM cities WHERE {where} LIMIT ?", (*args, limit)
+        ).fetchall()
+        return [
+            {"id": city_id, "name": name, "state": state, "country": country, "coord": {"lat": lat, "lon": lon}}
+            for city_id, name, state, country, lat, lon in rows
+        ]
+
+    def lookup(self, query, limit=20):
+        # Exact match on the normalized name, narrowed by ",CC" / ",State,CC" if given
+        name, state, country = split_query(query)
+        where, args = "key = ?", [normalize_name(name)]
+        if country:
+            where += " AND country = ?"
+            args.append(country)
+        if state:
+            where += " AND state = ?"
+            args.append(state)
+        return self._select(where, args, limit)
+
+    def prefix(self, query, limit=20):
+        name, state, country = split_query(query)
+        key = normalize_name(name)
+        if not key:
+            return []
+        # Range scan on the index: every key starting with `key` sorts in [key, key + U+10FFFF)
+        where, args = "key >= ? AND key < ?", [key, key + "\U0010ffff"]
+        if country:
+            where += " AND country = ?"
+            args.append(country)
+        if state:
+            where += " AND state = ?"
+            args.append(state)
+        return self._select(where + " ORDER BY key", args, limit)
+
+    def resolve(self, query):
+        # The city ID when the query names exactly one city, otherwise None so the
+        # caller can let /find rank ambiguous names (e.g. "London" without ",GB")
+        matches = self.lookup(query, limit=2)
+        if len(matches) == 1:
+            self.stats["hits"] += 1
+            return matches[0]["id"]
+        self.stats["ambiguous" if matches else "misses"] += 1
+        return None
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    if len(sys.argv) not in (2, 3):
+        sys.exit("usage: python city_index.py city.list.json[.gz] [city_index.sqlite3]")
+    output_path = sys.argv[2] if len(sys.argv) == 3 else DEFAULT_INDEX_PATH
+    start = time.perf_counter()
+    count = build_index(sys.argv[1], output_path)
+    print(f"Indexed {count} cities into {output_path} in {time.perf_counter() - start:.1f}s")
@@ -0,0 +1,125 @@
+import datetime
+from array import array
+from bisect import bisect_left
+from operator import itemgetter, le
+from typing import NamedTuple
+
+# Per-day statistics for the 5 day / 3 hour forecast. The forecast slots live
+# in flat typed columns (array.array), filled one append() per slot while the
+# response streams in (or in one go from a decoded dict with from_forecast()).
+# Since slots are kept in time order every local calendar day is a contiguous
+# slice of those columns: day boundaries are found by bisecting the timestamps,
+# and each day's min/max/mean is a few builtin calls on a slice, so summarizing
+# does Python-level work per day, not per slot.
+
+get_dt = itemgetter('dt')
+get_main = itemgetter('main')
+get_wind = itemgetter('wind')
+get_temp = itemgetter('temp')
+get_humidity = itemgetter('humidity')
+get_speed = itemgetter('speed')
+
+
+class Stat(NamedTuple):
+    min: float
+    max: float
+    mean: float
+
+
+class DaySummary(NamedTuple):
+    date: datetime.date  # local calendar day in the city's timezone
+    slots: int  # number of 3 hour forecast slots that fall on this day
+    temp: Stat
+    humidity: Stat
+    wind: Stat
+    pop: Stat  # probability of precipitation, 0..1
+
+
+class ForecastColumns:
+    __slots__ = ("dt", "temp", "humidity", "wind", "pop", "timezone")
+
+    def __init__(self, dt, temp, humidity, wind, pop, timezone=0):
+        self.dt = dt
+        self.temp = temp
+        self.humidity = humidity
+        self.wind = wind
+        self.pop = pop
+        self.timezone = timezone
+
+    @classmethod
+    def from_forecast(cls, data):
+        items = data['list']
+        dt = array('q', map(get_dt, items))
+        if not all(map(le, dt, dt[1:])):
+            items = sorted(items, key=get_dt)
+            dt = array('q', map(get_dt, items))
+        mains = list(map(get_main, items))
+        return cls(
+            dt,
+            array('d', map(get_temp, mains)),
+            array('d', map(get_humidity, mains)),
+            array('d', map(get_speed, map(get_wind, items))),
+            array('d', [item.get('pop', 0.0) for item in items]),
+            data['city'].get('timezone', 0),
+        )
+
+    @classmethod
+    def empty(cls, timezone=0):
+        return cls(array('q'), array('d'), array('d'), array('d'), array('d'), timezone)
+
+    def append(self, item):
+        # One entry of a /forecast `list`, for filling the columns while the response streams in
+        main = item['main']
+        self.dt.append(item['dt'])
+        self.temp.append(main['temp'])
+        self.humidity.append(main['humidity'])
+        self.wind.append(item['wind']['speed'])
+        self.pop.append(item.get('pop', 0.0))
+
+    def sort(self):
+        # Put appended slots in time order, if they didn't arrive that way
+        dt = self.dt
+        if all(map(le, dt, dt[1:])):
+            return
+        order = sorted(range(len(dt)), key=dt.__getitem__)
+        for name in ("dt", "temp", "humidity", "wind", "pop"):
+            column = getattr(self, name)
+            setattr(self, name, array(column.typecode, map(column.__getitem__, order)))
+
+    def __len__(self):
+        return len(self.dt)
+
+    def temperature_range(self):
+        return min(self.temp), max(self.temp)
+
+
+def column_stat(column, start, stop):
+    values = column[start:stop].tolist()
+    return Stat(min(values), max(values), sum(values) / len(values))
+
+
+def summarize_days(forecast):
+    # `forecast` is a /forecast response or ForecastColumns built from one
+    columns = forecast if isinstance(forecast, ForecastColumns) else ForecastColumns.from_forecast(forecast)
+    if not len(columns):
+        return []
+
+    dt = columns.dt
+    offset = columns.timezone
+    epoch = datetime.date(1970, 1, 1)
+    days = []
+    start = 0
+    while start < len(dt):
+        day_number = (dt[start] + offset) // 86400
+        # First slot at or after local midnight of the next day
+        stop = bisect_left(dt, (day_number + 1) * 86400 - offset, start)
+        days.append(DaySummary(
+            epoch + datetime.timedelta(days=day_number),
+            stop - start,
+            column_stat(columns.temp, start, stop),
+            column_stat(columns.humidity, start, stop),
+            column_stat(columns.wind, start, stop),
+            column_stat(columns.pop, start, stop),
+        ))
+        start = stop
+    return days
@@ -0,0 +1,154 @@
+import io
+import json
+import os
+import threading
+import time
+
+from PIL import Image
+
+from metrics import metrics
+from weather_client import ICON_BASE_URL, client
+
+# Every icon code OpenWeatherMap uses (https://openweathermap.org/weather-conditions)
+ICON_CODES = [f"{code:02d}{part}" for code in (1, 2, 3, 4, 9, 10, 11, 13, 50) for part in "dn"]
+
+DEFAULT_ICON_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "icons")
+
+# What a cold icon costs (HTTPS fetch of a ~5 KB PNG plus decode) until a real
+# download has been timed; measured averages are kept in icon_dir so a run that
+# never downloads (icons bundled or left by an earlier run) still has one
+ESTIMATED_DOWNLOAD_SECONDS = 0.25
+DOWNLOAD_COST_FILE = "download_seconds.json"
+
+
+class IconCache:
+    # Three levels, checked in order:
+    #   1. decoded PIL images and Tk PhotoImages held in memory, keyed by icon code
+    #   2. the raw PNGs in `icon_dir`, which survive restarts and can be bundled
+    #   3. the OpenWeatherMap icon URL, whose result is written back to 1 and 2
+    # load_image() is safe on worker threads; photo() must run on the Tk thread.
+
+    def __init__(self, icon_dir=DEFAULT_ICON_DIR, icon_base_url=ICON_BASE_URL, http_client=client):
+        self.icon_dir = icon_dir
+        self.icon_base_url = icon_base_url
+        self.http_client = http_client
+        self._images = {}
+        self._photos = {}
+        self._sources = {}  # icon code -> where its last load came from
+        self._lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "downloads": 0, "seconds_saved": 0.0}
+        # Average download + decode time and how many fetches it covers
+        self.download_seconds, self._download_samples = ESTIMATED_DOWNLOAD_SECONDS, 0
+        self._load_download_cost()
+
+    def _path(self, icon_code):
+        return os.path.join(self.icon_dir, f"{icon_code}@2x.png")
+
+    def _load_download_cost(self):
+        try:
+            with open(os.path.join(self.icon_dir, DOWNLOAD_COST_FILE), encoding="utf-8") as cost_file:
+                cost = json.load(cost_file)
+            self.download_seconds, self._download_samples = float(cost["seconds"]), int(cost["samples"])
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+    def _record_download(self, seconds):
+        with self._lock:
+            self.stats["downloads"] += 1
+            # The bundled estimate only counts until the first real measurement
+            samples = self._download_samples
+            self.download_seconds = (self.download_seconds * samples + seconds) / (samples + 1)
+            self._download_samples = samples + 1
+            cost = {"seconds": self.download_seconds, "samples": self._download_samples}
+        try:
+            with open(os.path.join(self.icon_dir, DOWNLOAD_COST_FILE), "w", encoding="utf-8") as cost_file:
+                json.dump(cost, cost_file)
+        except OSError:
+            pass
+
+    def saving(self, icon_code, seconds):
+        # Time the last load of `icon_code`, which took `seconds`, saved against a cold download
+        if self._sources.get(icon_code, "download") == "download":
+            return 0.0
+        return max(0.0, self.download_seconds - seconds)
+
+    def _record_hit(self, kind, seconds):
+        with self._lock:
+            self.stats[kind] += 1
+            self.stats["seconds_saved"] += max(0.0, self.download_seconds - seconds)
+
+    def load_image(self, icon_code):
+        start = time.perf_counter()
+        image = self._images.get(icon_code)
+        if image is not None:
+            self._sources[icon_code] = "memory"
+            self._record_hit("memory_hits", time.perf_counter() - start)
+            return image
+
+        path = self._path(icon_code)
+        if os.path.exists(path):
+            decode_start = time.perf_counter()
+            image = Image.open(path)
+            image.load()
+            metrics.observe("icon_decode_seconds", time.perf_counter() - decode_start, source="disk")
+            self._images[icon_code] = image
+            self._sources[icon_code] = "disk"
+            self._record_hit("disk_hits", time.perf_counter() - start)
+            return image
+
+        response = self.http_client.get(f"{self.icon_base_url}/{icon_code}@2x.png", rate_limited=False, endpoint="icon")
+        response.raise_for_status()
+        metrics.increment("http_response_bytes_total", len(response.content), endpoint="icon")
+        decode_start = time.perf_counter()
+        image = Image.open(io.BytesIO(response.content))
+        image.load()
+        metrics.observe("icon_decode_seconds", time.perf_counter() - decode_start, source="download")
+        self._images[icon_code] = image
+        self._sources[icon_code] = "download"
+        seconds = time.perf_counter() - start
+        self._save(path, response.content)
+        self._record_download(seconds)
+        return image
+
+    def _save(self, path, png_bytes):
+        try:
+            os.makedirs(self.icon_dir, exist_ok=True)
+            temp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(temp_path, "wb") as icon_file:
+                icon_file.write(png_bytes)
+            os.replace(temp_path, path)
+        except OSError:
+            pass  # a read-only install still works, it just can't keep icons on disk
+
+    def photo(self, icon_code, image=None):
+        photo = self._photos.get(icon_code)
+        if photo is None:
+            from PIL import ImageTk
+            photo = ImageTk.PhotoImage(image if image is not None else self.load_image(icon_code))
+            self._photos[icon_code] = photo
+        return photo
+
+    def prefetch(self, icon_codes=ICON_CODES, download=True):
+        # Fill the memory cache from disk, and with download=True fetch whatever
+        # isn't on disk yet. Returns the codes that couldn't be loaded.
+        missing = []
+        for icon_code in icon_codes:
+            if not download and not os.path.exists(self._path(icon_code)):
+                missing.append(icon_code)
+                continue
+            try:
+                self.load_image(icon_code)
+            except Exception:
+                missing.append(icon_code)
+        return missing
+
+
+if __name__ == "__main__":
+    # Download every icon into icons/ so it can be shipped with the app
+    start = time.perf_counter()
+    cache = IconCache()
+    missing = cache.prefetch()
+    print(f"Cached {len(ICON_CODES) - len(missing)} of {len(ICON_CODES)} icons in {cache.icon_dir} "
+          f"({cache.stats['downloads']} downloaded) in {time.perf_counter() - start:.1f}s")
+    if missing:
+        print(f"Failed: {', '.join(missing)}")
@@ -0,0 +1,214 @@
+import cProfile
+import functools
+import json
+import math
+import os
+import pstats
+import sys
+import threading
+import time
+
+# In-process counters and latency histograms for the Weather App, cheap enough
+# to leave on all the time. Series are keyed by name plus labels, e.g.
+#
+#   metrics.observe("http_response_seconds", 0.08, endpoint="forecast", status=200)
+#   metrics.increment("http_response_bytes_total", 16384, endpoint="forecast")
+#
+# and can be read back as JSON, as Prometheus text (for headless runs), or as
+# the short table the Tk debug panel shows. Components that already keep a
+# stats dict (the response cache, single-flight, ...) are added as collectors
+# and read when a snapshot is taken.
+
+PREFIX = "weather_"
+
+# Upper bounds in seconds; everything slower lands in +Inf
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Set WEATHER_APP_PROFILE to a file path to cProfile every search; the stats of
+# the latest one are written there and the top entries printed to stderr
+PROFILE_PATH = os.environ.get("WEATHER_APP_PROFILE")
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "count", "sum", "max")
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        index = 0
+        while index < len(self.buckets) and value > self.buckets[index]:
+            index += 1
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def cumulative(self):
+        # (upper bound, observations at or below it), ending with +Inf
+        total = 0
+        for bound, count in zip(self.buckets + (math.inf,), self.counts):
+            total += count
+            yield bound, total
+
+    def quantile(self, q):
+        # Upper bound of the bucket holding the q-th observation (the max for +Inf)
+        if not self.count:
+            return 0.0
+        for bound, total in self.cumulative():
+            if total >= q * self.count:
+                return min(bound, self.max)
+        return self.max
+
+
+class Metrics:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}  # (name, labels) -> value
+        self._histograms = {}  # (name, labels) -> Histogram
+        self._collectors = {}  # name -> callable returning a flat dict of numbers
+
+    def increment(self, name, amount=1, **labels):
+        key = series_key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name, value, **labels):
+        key = series_key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def add_collector(self, name, collect):
+        self._collectors[name] = collect
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def instrument(self, name):
+        # Decorator: time every call as call_seconds{function=name} and count the
+        # exceptions it raises as call_errors_total{function=name, error=type}
+        def decorate(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                except Exception as err:
+                    self.increment("call_errors_total", function=name, error=type(err).__name__)
+                    raise
+                finally:
+                    self.observe("call_seconds", time.perf_counter() - start, function=name)
+            return wrapper
+        return decorate
+
+    def snapshot(self):
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = [(key, histogram.count, histogram.sum, histogram.max, list(histogram.cumulative()),
+                           histogram.quantile(0.5), histogram.quantile(0.95))
+                          for key, histogram in sorted(self._histograms.items())]
+        snapshot = {"counters": {}, "histograms": {}, "collected": {}}
+        for (name, labels), value in counters:
+            snapshot["counters"].setdefault(name, []).append({"labels": dict(labels), "value": value})
+        for (name, labels), count, total, largest, cumulative, p50, p95 in histograms:
+            snapshot["histograms"].setdefault(name, []).append({
+                "labels": dict(labels), "count": count, "sum": total, "max": largest, "p50": p50, "p95": p95,
+                "buckets": {format_bound(bound): observations for bound, observations in cumulative},
+            })
+        for name, collect in sorted(self._collectors.items()):
+            snapshot["collected"][name] = dict(collect())
+        return snapshot
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self):
+        snapshot = self.snapshot()
+        lines = []
+        for name, series in snapshot["counters"].items():
+            lines.append(f"# TYPE {PREFIX}{name} counter")
+            lines.extend(f"{PREFIX}{name}{format_labels(entry['labels'])} {entry['value']}" for entry in series)
+        for name, series in snapshot["histograms"].items():
+            lines.append(f"# TYPE {PREFIX}{name} histogram")
+            for entry in series:
+                labels = entry["labels"]
+                for bound, observations in entry["buckets"].items():
+                    lines.append(f"{PREFIX}{name}_bucket{format_labels(dict(labels, le=bound))} {observations}")
+                lines.append(f"{PREFIX}{name}_sum{format_labels(labels)} {entry['sum']}")
+                lines.append(f"{PREFIX}{name}_count{format_labels(labels)} {entry['count']}")
+        for collector, values in snapshot["collected"].items():
+            for key, value in values.items():
+                if isinstance(value, (int, float)):
+                    lines.append(f"# TYPE {PREFIX}{collector}_{key} gauge")
+                    lines.append(f"{PREFIX}{collector}_{key} {value}")
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path, format="json"):
+        text = self.to_prometheus() if format == "prometheus" else self.to_json()
+        if path == "-":
+            sys.stdout.write(text)
+            return
+        with open(path, "w", encoding="utf-8") as dump_file:
+            dump_file.write(text)
+
+    def summary_lines(self):
+        # One line per series, for the debug panel
+        snapshot = self.snapshot()
+        lines = []
+        for name, series in snapshot["histograms"].items():
+            for entry in series:
+                lines.append(f"{name}{format_labels(entry['labels'])}  n={entry['count']}  "
+                             f"p50={entry['p50'] * 1000:.1f}ms  p95={entry['p95'] * 1000:.1f}ms  "
+                             f"max={entry['max'] * 1000:.1f}ms")
+        for name, series in snapshot["counters"].items():
+            lines.extend(f"{name}{format_labels(entry['labels'])}  {entry['value']}" for entry in series)
+        for collector, values in snapshot["collected"].items():
+            lines.append(f"{collector}: " + ", ".join(f"{key}={format_value(value)}" for key, value in values.items()))
+        return lines
+
+
+def series_key(name, labels):
+    return name, tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def format_bound(bound):
+    return "+Inf" if bound == math.inf else repr(bound)
+
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in labels.items()) + "}"
+
+
+def format_value(value):
+    return f"{value:.3f}" if isinstance(value, float) else str(value)
+
+
+def profile_call(label, func, *args):
+    # Runs func(*args), under cProfile when WEATHER_APP_PROFILE is set. Only the
+    # calling thread is profiled: time spent waiting on pool workers shows up
+    # as the wait, not as the workers' own calls.
+    if not PROFILE_PATH:
+        return func(*args)
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(func, *args)
+    finally:
+        profiler.dump_stats(PROFILE_PATH)
+        print(f"[profile] {label} -> {PROFILE_PATH}", file=sys.stderr)
+        pstats.Stats(profiler, stream=sys.stderr).sort_stats("cumulative").print_stats(15)
+
+
+# Shared by every module of the app
+metrics = Metrics()
@@ -0,0 +1,197 @@
+import collections
+import contextlib
+import contextvars
+import datetime
+import heapq
+import itertools
+import math
+import sqlite3
+import threading
+import time
+
+# Client-side token bucket in front of every OpenWeatherMap request, so the
+# shared api_key stays under the per-minute limit instead of running into 429s.
+# The bucket smooths bursts; a log of the last minute's grants caps any 60 s
+# window at `requests_per_minute`, which a full bucket plus its refill alone
+# would overshoot by `burst`.
+# Callers over the budget are queued, not failed, and served strictly by lane:
+# a waiting interactive search always goes before queued background refreshes.
+# Requests are also counted per UTC day in a small SQLite file.
+#
+# Time comes from the injected `clock` and waiting goes through the injected
+# `wait(condition, timeout)`, so a fake clock that advances on wait() makes the
+# limiter fully deterministic, e.g.
+#
+#   now = [0.0]
+#   limiter = RateLimiter(60, burst=1, clock=lambda: now[0],
+#                         wait=lambda condition, timeout: now.__setitem__(0, now[0] + timeout))
+
+INTERACTIVE = 0
+BACKGROUND = 1
+LANE_NAMES = {INTERACTIVE: "interactive", BACKGROUND: "background"}
+WINDOW = 60.0  # seconds the per-minute limit is enforced over
+
+# The lane for requests made in the current context; see priority()
+request_priority = contextvars.ContextVar("request_priority", default=BACKGROUND)
+
+
+@contextlib.contextmanager
+def priority(lane):
+    token = request_priority.set(lane)
+    try:
+        yield
+    finally:
+        request_priority.reset(token)
+
+
+def wait_on_condition(condition, timeout):
+    condition.wait(timeout)
+
+
+class UsageCounter:
+    # Requests per UTC day and lane. With `path` set they're counted in a SQLite
+    # file, one UPDATE ... + 1 per request, so processes sharing the api_key
+    # (the GUI and a cron --batch run) add to the same totals instead of
+    # overwriting each other's. `usage` is the last total read back.
+
+    def __init__(self, path=None, today=lambda: datetime.datetime.now(datetime.UTC).date().isoformat()):
+        self.path = path
+        self.today = today
+        self.usage = {"date": today(), "total": 0, "by_lane": {}}
+        self._lock = threading.Lock()
+        self._db = None
+        if path:
+            try:
+                self._db = sqlite3.connect(path, timeout=5, check_same_thread=False)
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS usage "
+                    "(date TEXT NOT NULL, lane TEXT NOT NULL, requests INTEGER NOT NULL, PRIMARY KEY (date, lane))"
+                )
+                self._db.commit()
+                self._read(self.usage["date"])
+            except sqlite3.Error:
+                self._db = None  # counting is best effort; fall back to this process only
+
+    def _read(self, today):
+        by_lane = dict(self._db.execute("SELECT lane, requests FROM usage WHERE date = ?", (today,)).fetchall())
+        self.usage = {"date": today, "total": sum(by_lane.values()), "by_lane": by_lane}
+
+    def record(self, lane):
+        today = self.today()
+        name = LANE_NAMES.get(lane, str(lane))
+        with self._lock:
+            if self._db is not None:
+                try:
+                    with self._db:
+                        self._db.execute(
+                            "INSERT INTO usage (date, lane, requests) VALUES (?, ?, 1) "
+                            "ON CONFLICT (date, lane) DO UPDATE SET requests = requests + 1",
+                            (today, name),
+                        )
+                    self._read(today)
+                    return
+                except sqlite3.Error:
+                    pass  # never block a request on it; count in memory instead
+            if self.usage["date"] != today:
+                self.usage = {"date": today, "total": 0, "by_lane": {}}
+            self.usage["total"] += 1
+            self.usage["by_lane"][name] = self.usage["by_lane"].get(name, 0) + 1
+
+    def today_total(self):
+        today = self.today()
+        with self._lock:
+            if self._db is not None:
+                try:
+                    self._read(today)  # picks up requests other processes made since
+                except sqlite3.Error:
+                    pass
+            return self.usage["total"] if self.usage["date"] == today else 0
+
+
+class RateLimiter:
+
+    def __init__(self, requests_per_minute=60, burst=10, clock=time.monotonic, wait=wait_on_condition, usage=None):
+        self.clock = clock
+        self.wait = wait
+        self.usage = usage if usage is not None else UsageCounter()
+        self.stats = {"acquired": 0, "queued": 0, "waited_seconds": 0.0}
+
+        self._condition = threading.Condition()
+        self._waiters = []  # heap of (lane, arrival number)
+        self._arrivals = itertools.count()
+        self._paused_until = 0.0
+        self._granted = collections.deque()  # clock() of each grant in the last WINDOW seconds
+        self.per_minute = requests_per_minute
+        self.rate = requests_per_minute / 60.0  # tokens per second
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = clock()
+
+    def set_rate(self, requests_per_minute, burst=None):
+        with self._condition:
+            self._refill(self.clock())
+            self.per_minute = requests_per_minute
+            self.rate = requests_per_minute / 60.0
+            if burst is not None:
+                self.burst = max(1, burst)
+            self._tokens = min(self._tokens, self.burst)
+            self._condition.notify_all()
+
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        while self._granted and self._granted[0] <= now - WINDOW:
+            self._granted.popleft()
+
+    def _window_full(self):
+        return len(self._granted) >= self.per_minute
+
+    def acquire(self, lane=None):
+        # Blocks until a token is available for this caller; returns seconds waited
+        lane = request_priority.get() if lane is None else lane
+        with self._condition:
+            start = self.clock()
+            ticket = (lane, next(self._arrivals))
+            heapq.heappush(self._waiters, ticket)
+            queued = False
+            try:
+                while True:
+                    now = self.clock()
+                    self._refill(now)
+                    at_head = self._waiters[0] == ticket
+                    if at_head and self._tokens >= 1 and not self._window_full() and now >= self._paused_until:
+                        heapq.heappop(self._waiters)
+                        self._tokens -= 1
+                        self._granted.append(now)
+                        break
+                    queued = True
+                    # Only the head of the queue needs a timer; everyone else is woken when it leaves
+                    timeout = None
+                    if at_head:
+                        timeout = max((1 - self._tokens) / self.rate, self._paused_until - now, 0.001)
+                        if self._window_full():
+                            timeout = max(timeout, self._granted[len(self._granted) - math.ceil(self.per_minute)] + WINDOW - now)
+                    self.wait(self._condition, timeout)
+            except BaseException:
+                self._waiters.remove(ticket)
+                heapq.heapify(self._waiters)
+                raise
+            finally:
+                self._condition.notify_all()
+
+            waited = self.clock() - start
+            self.stats["acquired"] += 1
+            self.stats["queued"] += queued
+            self.stats["waited_seconds"] += waited
+            self.usage.record(lane)
+        return waited
+
+    def pause(self, seconds):
+        # The server said slow down (429): hand out nothing for `seconds`
+        with self._condition:
+            self._paused_until = max(self._paused_until, self.clock() + seconds)
+            self._tokens = min(self._tokens, 0.0)
+
+    def queue_length(self):
+        with self._condition:
+            return len(self._waiters)
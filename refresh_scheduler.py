@@ -0,0 +1,62 @@
+# Periodic jobs driven by the Tk event loop. Only `after` and `after_cancel`
+# are needed (root.after / root.after_cancel), so nothing here imports tkinter
+# and the scheduler can be driven by a fake loop.
+
+
+class RefreshScheduler:
+
+    def __init__(self, after, after_cancel):
+        self.after = after
+        self.after_cancel = after_cancel
+        self._jobs = {}  # name -> (interval_ms, callback, pending after id)
+        self.stats = {}  # name -> number of times the job ran
+
+    def every(self, name, interval_ms, callback, run_now=False):
+        # (Re)start `callback` every `interval_ms`; an existing job of the same name is replaced
+        self.cancel(name)
+        self._jobs[name] = (interval_ms, callback, None)
+        self.stats.setdefault(name, 0)
+        self._arm(name, 0 if run_now else interval_ms)
+
+    def once(self, name, delay_ms, callback):
+        # Run `callback` once after `delay_ms`. Calling again before then starts
+        # the wait over, so a burst of calls (a window being dragged to a new
+        # size) ends in a single run once the burst is over.
+        self.cancel(name)
+        self._jobs[name] = (None, callback, None)
+        self.stats.setdefault(name, 0)
+        self._arm(name, delay_ms)
+
+    def _arm(self, name, delay_ms):
+        interval_ms, callback, _ = self._jobs[name]
+        after_id = self.after(delay_ms, self._run, name)
+        self._jobs[name] = (interval_ms, callback, after_id)
+
+    def _run(self, name):
+        if name not in self._jobs:
+            return
+        interval_ms, callback, _ = self._jobs[name]
+        job = (interval_ms, callback, None)  # this run's after id is spent
+        self._jobs[name] = job
+        self.stats[name] += 1
+        try:
+            callback()
+        finally:
+            # Unless the callback cancelled or replaced its own job, go again
+            if self._jobs.get(name) is job:
+                if interval_ms is None:
+                    del self._jobs[name]
+                else:
+                    self._arm(name, interval_ms)
+
+    def cancel(self, name):
+        job = self._jobs.pop(name, None)
+        if job is not None and job[2] is not None:
+            self.after_cancel(job[2])
+
+    def cancel_all(self):
+        for name in list(self._jobs):
+            self.cancel(name)
+
+    def __contains__(self, name):
+        return name in self._jobs
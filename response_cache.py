@@ -0,0 +1,197 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# How long a response is served without asking the API again, per endpoint (seconds)
+ENDPOINT_TTLS = {
+    "find": 7 * 24 * 3600,  # city IDs don't move
+    "forecast": 3600,  # the 5 day / 3 hour forecast is regenerated every few hours
+    "air_pollution": 600,
+    "uvi": 3600,
+}
+DEFAULT_TTL = 600
+
+# Past its TTL an entry is still returned for this long while a background refresh
+# replaces it (stale-while-revalidate); after that it's treated as a miss
+STALE_GRACE = {
+    "find": 30 * 24 * 3600,
+    "forecast": 6 * 3600,
+    "air_pollution": 3600,
+    "uvi": 6 * 3600,
+}
+
+# Never part of the key: the same city looked up with another key is the same data
+IGNORED_PARAMS = frozenset({"appid"})
+
+
+def make_key(endpoint, params):
+    normalized = {}
+    for name, value in params.items():
+        if name in IGNORED_PARAMS:
+            continue
+        if isinstance(value, str):
+            value = " ".join(value.split()).lower()
+        elif isinstance(value, float):
+            value = round(value, 4)
+        normalized[name] = value
+    return f"{endpoint}?{json.dumps(normalized, sort_keys=True)}"
+
+
+class ResponseCache:
+    # Size-bounded LRU of decoded responses with a TTL per endpoint.
+    # With `path` set, entries are written through to a SQLite file and the most
+    # recently used ones are loaded back on start, so a restarted app starts warm.
+    # `codecs` maps an endpoint to (encode, decode) functions between its values
+    # and plain JSON for the SQLite copy; values of other endpoints must be JSON.
+    # A file written with a different `format_version` is emptied on open, since
+    # its rows may decode without error into the wrong values.
+
+    def __init__(self, max_entries=256, ttls=None, stale_grace=None, path=None, clock=time.time, codecs=None,
+                 format_version=0):
+        self.max_entries = max_entries
+        self.ttls = dict(ENDPOINT_TTLS, **(ttls or {}))
+        self.stale_grace = dict(STALE_GRACE, **(stale_grace or {}))
+        self.clock = clock
+        self.codecs = codecs or {}
+        self.stats = {"hits": 0, "stale_hits": 0, "misses": 0, "evictions": 0, "refreshes": 0, "refresh_errors": 0}
+
+        self._entries = OrderedDict()  # key -> (endpoint, stored_at, value)
+        self._lock = threading.RLock()
+        self._refreshing = set()
+        self._refresh_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="cache-refresh")
+
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            if self._db.execute("PRAGMA user_version").fetchone()[0] != format_version:
+                self._db.execute("DROP TABLE IF EXISTS responses")
+                self._db.execute(f"PRAGMA user_version = {int(format_version)}")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses "
+                "(key TEXT PRIMARY KEY, endpoint TEXT NOT NULL, stored_at REAL NOT NULL, value TEXT NOT NULL)"
+            )
+            self._db.commit()
+            self._load()
+
+    def _load(self):
+        rows = self._db.execute(
+            "SELECT key, endpoint, stored_at, value FROM responses ORDER BY stored_at DESC LIMIT ?",
+            (self.max_entries,),
+        ).fetchall()
+        for key, endpoint, stored_at, value in reversed(rows):
+            try:
+                self._entries[key] = (endpoint, stored_at, self._decode(endpoint, value))
+            except (ValueError, TypeError, KeyError, IndexError):
+                continue  # written in an older format; the next fetch replaces it
+        # Rows that didn't fit are gone for good
+        self._db.execute(
+            "DELETE FROM responses WHERE key NOT IN (SELECT key FROM responses ORDER BY stored_at DESC LIMIT ?)",
+            (self.max_entries,),
+        )
+        self._db.commit()
+
+    def _encode(self, endpoint, value):
+        codec = self.codecs.get(endpoint)
+        return json.dumps(codec[0](value) if codec else value)
+
+    def _decode(self, endpoint, text):
+        codec = self.codecs.get(endpoint)
+        value = json.loads(text)
+        return codec[1](value) if codec else value
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def lookup(self, endpoint, params):
+        # Returns (value, state) with state one of "fresh", "stale" or "miss"
+        key = make_key(endpoint, params)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None, "miss"
+            _, stored_at, value = entry
+            age = self.clock() - stored_at
+            ttl = self.ttls.get(endpoint, DEFAULT_TTL)
+            if age <= ttl:
+                self._entries.move_to_end(key)
+                return value, "fresh"
+            if age <= ttl + self.stale_grace.get(endpoint, 0):
+                self._entries.move_to_end(key)
+                return value, "stale"
+            return None, "miss"
+
+    def store(self, endpoint, params, value):
+        key = make_key(endpoint, params)
+        stored_at = self.clock()
+        with self._lock:
+            self._entries[key] = (endpoint, stored_at, value)
+            self._entries.move_to_end(key)
+            evicted = []
+            while len(self._entries) > self.max_entries:
+                evicted.append(self._entries.popitem(last=False)[0])
+                self.stats["evictions"] += 1
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses (key, endpoint, stored_at, value) VALUES (?, ?, ?, ?)",
+                    (key, endpoint, stored_at, self._encode(endpoint, value)),
+                )
+                self._db.executemany("DELETE FROM responses WHERE key = ?", [(old_key,) for old_key in evicted])
+                self._db.commit()
+
+    def fetch(self, endpoint, params, loader, allow_stale=True):
+        # Serve from the cache when possible, otherwise call loader() and remember
+        # what it returns. Exceptions from loader() propagate to the caller.
+        # With allow_stale=False an expired entry is reloaded before returning,
+        # for callers like the auto-refresh that already run in the background.
+        value, state = self.lookup(endpoint, params)
+        if state == "fresh":
+            self._count("hits")
+            return value
+        if state == "stale" and allow_stale:
+            self._count("stale_hits")
+            self._refresh_in_background(endpoint, params, loader)
+            return value
+        self._count("misses")
+        value = loader()
+        self.store(endpoint, params, value)
+        return value
+
+    def _refresh_in_background(self, endpoint, params, loader):
+        key = make_key(endpoint, params)
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                self.store(endpoint, params, loader())
+                self._count("refreshes")
+            except Exception:
+                # Keep serving the stale copy; the next lookup will try again
+                self._count("refresh_errors")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        self._refresh_executor.submit(refresh)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+                self._db.commit()
+
+    def close(self):
+        self._refresh_executor.shutdown(wait=True)
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,44 @@
+import threading
+from concurrent.futures import Future
+
+# Request coalescing: while a call for a key is in flight, further callers with
+# the same key wait for it and share its result (or exception) instead of
+# issuing their own identical request.
+
+
+class SingleFlight:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight = {}  # key -> Future of the leader's call
+        self.stats = {"calls": 0, "upstream": 0, "shared": 0}
+
+    def do(self, key, func):
+        with self._lock:
+            self.stats["calls"] += 1
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self._in_flight[key] = Future()
+                self.stats["upstream"] += 1
+            else:
+                self.stats["shared"] += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = func()
+        except BaseException as err:
+            future.set_exception(err)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._in_flight)
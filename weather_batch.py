@@ -0,0 +1,134 @@
+import argparse
+import csv
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from metrics import metrics
+from rate_limiter import BACKGROUND, priority
+from weather_client import client
+from weather_core import (WeatherAPIError, WeatherConnectionError, WeatherError, get_air_quality_data, get_city_id,
+                          get_uv_index_data, get_weather_data, summarize_weather)
+
+# Headless multi-city mode, also reachable as `python "Weather App.py" --batch`:
+#
+#   python weather_batch.py Rajkot Gondal "London,GB"
+#   python weather_batch.py -f cities.txt --format jsonl --rpm 60 > weather.jsonl
+#
+# Rows are written as each city finishes rather than at the end of the run.
+# --metrics run.prom --metrics-format prometheus writes request latencies,
+# byte and error counts for the whole run when it ends.
+
+BATCH_FIELDS = [
+    "query", "city_id", "city", "country", "local_time", "temp_c", "high_c", "low_c",
+    "humidity", "pressure", "wind_speed", "description", "uv_index", "aqi", "error",
+]
+
+
+def fetch_city_row(api_key, city_name):
+    with priority(BACKGROUND):
+        return build_city_row(api_key, city_name)
+
+
+def describe_error(err):
+    # What goes in the row's error column. Rows end up in files and cron mail, so
+    # never the requests error text: it contains the URL, appid and all.
+    if isinstance(err, WeatherAPIError):
+        problem = f"HTTP {err.status_code}" if err.status_code is not None else "invalid response"
+        return f"/{err.endpoint}: {problem}"
+    if isinstance(err, WeatherConnectionError):
+        cause = type(err.__cause__).__name__ if err.__cause__ is not None else "connection error"
+        return f"/{err.endpoint}: could not reach the weather service ({cause})"
+    return str(err)
+
+
+def build_city_row(api_key, city_name):
+    row = dict.fromkeys(BATCH_FIELDS)
+    row["query"] = city_name
+    errors = []
+    try:
+        weather_data = get_weather_data(api_key, get_city_id(api_key, city_name))
+    except WeatherError as err:
+        row["error"] = describe_error(err)
+        return row
+
+    # A missing AQI or UV value shouldn't throw away the forecast we already have
+    lat, lon = weather_data.city.lat, weather_data.city.lon
+    air_quality_data = uv_index_data = None
+    try:
+        air_quality_data = get_air_quality_data(api_key, lat, lon)
+    except WeatherError as err:
+        errors.append(describe_error(err))
+    try:
+        uv_index_data = get_uv_index_data(api_key, lat, lon)
+    except WeatherError as err:
+        errors.append(describe_error(err))
+
+    summary = summarize_weather(weather_data, air_quality_data, uv_index_data)
+    row.update((field, summary[field]) for field in BATCH_FIELDS if field in summary)
+    if errors:
+        row["error"] = "; ".join(errors)
+    return row
+
+
+def read_city_list(path):
+    # One city per line; blank lines and lines starting with # are skipped
+    with (sys.stdin if path == "-" else open(path, encoding="utf-8")) as city_file:
+        return [line.strip() for line in city_file if line.strip() and not line.lstrip().startswith("#")]
+
+
+def main(argv=None, default_api_key=None):
+    parser = argparse.ArgumentParser(
+        description="Fetch weather for many cities without opening a window; rows are written as each city finishes.",
+    )
+    parser.add_argument("--batch", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("cities", nargs="*", help="city names, e.g. Rajkot \"London,GB\"")
+    parser.add_argument("-f", "--file", help="read city names from this file, one per line (- for stdin)")
+    parser.add_argument("--format", choices=["csv", "jsonl"], default="csv")
+    parser.add_argument("-o", "--output", help="write here instead of stdout")
+    parser.add_argument("--workers", type=int, default=4, help="cities fetched at the same time (default 4)")
+    parser.add_argument("--rpm", type=float, default=60, help="API requests per minute across all workers (default 60, the free tier limit)")
+    parser.add_argument("--api-key", default=os.environ.get("OWM_API_KEY", default_api_key))
+    parser.add_argument("--metrics", help="write request metrics here when done (- for stdout)")
+    parser.add_argument("--metrics-format", choices=["json", "prometheus"], default="json")
+    args = parser.parse_args(argv)
+
+    cities = list(args.cities)
+    if args.file:
+        cities += read_city_list(args.file)
+    if not cities:
+        parser.error("no cities given")
+    if args.rpm <= 0:
+        parser.error("--rpm must be greater than 0")
+    if not args.api_key:
+        parser.error("no API key: pass --api-key or set OWM_API_KEY")
+
+    client.limiter.set_rate(args.rpm)
+    output = open(args.output, "w", newline="", encoding="utf-8") if args.output else sys.stdout
+    if args.format == "csv":
+        writer = csv.DictWriter(output, fieldnames=BATCH_FIELDS)
+        writer.writeheader()
+        write_row = writer.writerow
+    else:
+        write_row = lambda row: output.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+    failures = 0
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, args.workers), thread_name_prefix="weather-batch") as batch_executor:
+            futures = [batch_executor.submit(fetch_city_row, args.api_key, city) for city in cities]
+            for future in as_completed(futures):
+                row = future.result()
+                failures += row["city_id"] is None
+                write_row(row)
+                output.flush()
+    finally:
+        if output is not sys.stdout:
+            output.close()
+        if args.metrics:
+            metrics.dump(args.metrics, args.metrics_format)
+    return 1 if failures == len(cities) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
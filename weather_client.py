@@ -0,0 +1,120 @@
+import os
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from metrics import metrics
+from rate_limiter import RateLimiter, UsageCounter
+
+# Point these at a local stub server to run the app or benchmarks offline
+API_BASE_URL = os.environ.get("OWM_API_BASE_URL", "http://api.openweathermap.org/data/2.5")
+ICON_BASE_URL = os.environ.get("OWM_ICON_BASE_URL", "http://openweathermap.org/img/wn")
+
+CONNECT_TIMEOUT = float(os.environ.get("OWM_CONNECT_TIMEOUT", "3.05"))
+READ_TIMEOUT = float(os.environ.get("OWM_READ_TIMEOUT", "10"))
+MAX_RETRIES = int(os.environ.get("OWM_MAX_RETRIES", "3"))
+BACKOFF_BASE = 0.5  # seconds; doubled on every attempt
+BACKOFF_MAX = 8.0  # cap for both the computed backoff and a server's Retry-After
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# The free tier allows 60 calls a minute per key
+RATE_PER_MINUTE = float(os.environ.get("OWM_RATE_PER_MINUTE", "60"))
+RATE_BURST = int(os.environ.get("OWM_RATE_BURST", "10"))
+USAGE_FILE = os.environ.get(
+    "OWM_USAGE_FILE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "api_usage.sqlite3")
+)
+
+
+class WeatherClient:
+    # One pooled requests.Session shared by every OpenWeatherMap call, so
+    # consecutive lookups reuse the same keep-alive connection. Retries 429/5xx
+    # responses and connection errors a bounded number of times with full-jitter
+    # exponential backoff; anything else is returned to the caller unchanged.
+
+    def __init__(self, connect_timeout=CONNECT_TIMEOUT, read_timeout=READ_TIMEOUT,
+                 max_retries=MAX_RETRIES, backoff_base=BACKOFF_BASE, backoff_max=BACKOFF_MAX,
+                 pool_size=10, sleep=time.sleep, limiter=None):
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.sleep = sleep
+        self.limiter = limiter  # optional RateLimiter; every attempt takes a token
+
+        self.session = requests.Session()
+        # Retries are handled in get() so urllib3 must not retry on its own
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "retries": 0, "failures": 0}
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def _record(self, endpoint, status, start):
+        # Time until the response headers arrived (connect included); a streamed
+        # body is read later by the caller and measured there
+        metrics.observe("http_response_seconds", time.perf_counter() - start, endpoint=endpoint, status=status)
+        metrics.increment("http_requests_total", endpoint=endpoint, status=status)
+
+    def backoff_delay(self, attempt, retry_after=None):
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def get(self, url, params=None, rate_limited=True, endpoint=None, **kwargs):
+        # rate_limited=False for requests that don't count against the api_key, like icons.
+        # `endpoint` labels the request in metrics; by default the last part of the URL path.
+        kwargs.setdefault("timeout", self.timeout)
+        endpoint = endpoint or url.rstrip("/").rsplit("/", 1)[-1]
+        for attempt in range(self.max_retries + 1):
+            self._count("requests")
+            retry_after = None
+            response = None
+            if rate_limited and self.limiter is not None:
+                self.limiter.acquire()
+            start = time.perf_counter()
+            try:
+                response = self.session.get(url, params=params, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as err:
+                self._record(endpoint, type(err).__name__, start)
+                if attempt == self.max_retries:
+                    self._count("failures")
+                    raise
+            else:
+                self._record(endpoint, response.status_code, start)
+                if response.status_code not in RETRY_STATUSES:
+                    return response
+                if attempt == self.max_retries:
+                    self._count("failures")
+                    return response
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                response.close()
+            self._count("retries")
+            delay = self.backoff_delay(attempt, retry_after)
+            if self.limiter is not None and response is not None and response.status_code == 429:
+                # Everyone sharing the key should back off, not just this caller
+                self.limiter.pause(delay)
+            self.sleep(delay)
+
+    def close(self):
+        self.session.close()
+
+
+def parse_retry_after(value):
+    # Only the delay-seconds form; an HTTP-date falls back to computed backoff
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+# Shared by all get_* functions and the icon download
+client = WeatherClient(limiter=RateLimiter(RATE_PER_MINUTE, RATE_BURST, usage=UsageCounter(USAGE_FILE)))
@@ -0,0 +1,251 @@
+import contextvars
+import datetime
+import os
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from city_index import DEFAULT_INDEX_PATH, CityIndex
+from forecast_summary import summarize_days
+from metrics import metrics
+from response_cache import ResponseCache, make_key
+from single_flight import SingleFlight
+from weather_client import API_BASE_URL, client
+from weather_records import RECORD_CODECS, RECORD_FORMAT, STREAM_CHUNK_SIZE, parse_response
+
+# Data layer of the Weather App: fetching from OpenWeatherMap and turning the
+# responses into display-ready values. Nothing here imports tkinter or PIL or
+# shows a dialog, so it can be used from scripts, cron jobs and benchmarks;
+# failures are raised as WeatherError subclasses for the caller to present.
+# Responses come back as the compact records from weather_records.
+
+
+class WeatherError(Exception):
+    pass
+
+
+class CityNotFoundError(WeatherError):
+
+    def __init__(self, city_name):
+        super().__init__(f"City not found: {city_name}")
+        self.city_name = city_name
+
+
+class WeatherAPIError(WeatherError):
+    # The API answered, but with an error status or a body we couldn't read
+
+    def __init__(self, message, endpoint, status_code=None):
+        super().__init__(message)
+        self.endpoint = endpoint
+        self.status_code = status_code
+
+
+class WeatherConnectionError(WeatherError):
+    # The API couldn't be reached at all (DNS, refused, timed out)
+
+    def __init__(self, message, endpoint):
+        super().__init__(message)
+        self.endpoint = endpoint
+
+
+# Set WEATHER_APP_TIMINGS=1 to print a per-stage timing breakdown for each search
+SHOW_TIMINGS = bool(os.environ.get("WEATHER_APP_TIMINGS"))
+
+# Worker pool for the lookups that can run side by side once the forecast is known
+fetch_executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix="weather-fetch")
+
+# Set WEATHER_APP_CACHE_FILE to a path to keep cached responses across restarts
+response_cache = ResponseCache(path=os.environ.get("WEATHER_APP_CACHE_FILE"), codecs=RECORD_CODECS,
+                               format_version=RECORD_FORMAT)
+
+# Identical lookups already in flight (same endpoint and normalized params) share one upstream call
+single_flight = SingleFlight()
+
+# AQI and UV are looked up on coordinates rounded to this many places (~1 km),
+# so lookups for nearby points share cache entries and in-flight requests
+COORD_PRECISION = 2
+
+# Built with `python city_index.py city.list.json.gz`; without it every name goes to /find
+city_index = CityIndex(os.environ.get("WEATHER_APP_CITY_INDEX", DEFAULT_INDEX_PATH))
+
+metrics.add_collector("response_cache", lambda: response_cache.stats)
+metrics.add_collector("single_flight", lambda: single_flight.stats)
+metrics.add_collector("http_client", lambda: client.stats)
+metrics.add_collector("city_index", lambda: city_index.stats)
+if client.limiter is not None:
+    metrics.add_collector("rate_limiter", lambda: dict(client.limiter.stats, today=client.limiter.usage.today_total()))
+
+
+def counted(chunks, endpoint):
+    # Passes the body chunks through, adding their size to http_response_bytes_total
+    for chunk in chunks:
+        metrics.increment("http_response_bytes_total", len(chunk), endpoint=endpoint)
+        yield chunk
+
+
+def fetch_json(endpoint, params, allow_stale=True):
+    def request():
+        try:
+            # Streamed, so the record is built while the body arrives instead of from a full dict tree
+            with client.get(f"{API_BASE_URL}/{endpoint}", params=params, stream=True, endpoint=endpoint) as response:
+                response.raise_for_status()
+                start = time.perf_counter()
+                record = parse_response(endpoint, counted(response.iter_content(STREAM_CHUNK_SIZE), endpoint))
+                metrics.observe("read_and_parse_seconds", time.perf_counter() - start, endpoint=endpoint)
+                return record
+        except requests.exceptions.HTTPError as http_err:
+            raise WeatherAPIError(f"HTTP error occurred: {http_err}", endpoint, http_err.response.status_code) from http_err
+        except requests.exceptions.RequestException as err:
+            raise WeatherConnectionError(f"Could not reach the weather service: {err}", endpoint) from err
+        except (ValueError, KeyError, IndexError, TypeError, AttributeError) as err:
+            raise WeatherAPIError(f"Invalid response from /{endpoint}: {err!r}", endpoint) from err
+
+    def load():
+        return single_flight.do(make_key(endpoint, params), request)
+
+    return response_cache.fetch(endpoint, params, load, allow_stale=allow_stale)
+
+
+@metrics.instrument("get_city_id")
+def get_city_id(api_key, city_name):
+    if city_index.available():
+        try:
+            city_id = city_index.resolve(city_name)
+            if city_id:
+                return city_id
+        except sqlite3.Error:
+            pass  # a broken index shouldn't stop the /find fallback
+    params = {
+        "q": city_name,
+        "appid": api_key
+    }
+    matches = fetch_json("find", params)
+    if matches.ids:
+        return matches.ids[0]
+    raise CityNotFoundError(city_name)
+
+
+@metrics.instrument("get_weather_data")
+def get_weather_data(api_key, city_id, allow_stale=True):
+    params = {
+        "id": city_id,
+        "appid": api_key,
+        "units": "metric"
+    }
+    return fetch_json("forecast", params, allow_stale)
+
+
+@metrics.instrument("get_air_quality_data")
+def get_air_quality_data(api_key, lat, lon, allow_stale=True):
+    params = {
+        "lat": round(lat, COORD_PRECISION),
+        "lon": round(lon, COORD_PRECISION),
+        "appid": api_key
+    }
+    return fetch_json("air_pollution", params, allow_stale)
+
+
+@metrics.instrument("get_uv_index_data")
+def get_uv_index_data(api_key, lat, lon, allow_stale=True):
+    params = {
+        "lat": round(lat, COORD_PRECISION),
+        "lon": round(lon, COORD_PRECISION),
+        "appid": api_key
+    }
+    return fetch_json("uvi", params, allow_stale)
+
+
+def timed(timings, stage, func, *args):
+    start = time.perf_counter()
+    try:
+        return func(*args)
+    finally:
+        timings[stage] = time.perf_counter() - start
+
+
+def submit_in_context(func, *args):
+    # Run on fetch_executor with the caller's context, so the rate limiter lane carries over
+    return fetch_executor.submit(contextvars.copy_context().run, func, *args)
+
+
+def fetch_weather(api_key, city_name, cancelled=lambda: False, icon_loader=None, icon_saving=None):
+    # /find and /forecast have to run in order, but once the forecast gives us
+    # lat/lon and the icon code the remaining requests are independent.
+    # `cancelled` is checked between stages so a superseded search stops early
+    # and returns None. `icon_loader(icon_code)`, if given, runs alongside the
+    # AQI and UV lookups and its result is the fourth item of the result;
+    # `icon_saving(icon_code, seconds)` turns the icon stage's time into the
+    # time a cache hit saved, reported as timings["icon_saved"].
+    timings = {}
+    start = time.perf_counter()
+    result = None
+    city_id = timed(timings, "find", get_city_id, api_key, city_name)
+    if not cancelled():
+        weather_data = timed(timings, "forecast", get_weather_data, api_key, city_id)
+        if not cancelled():
+            lat, lon = weather_data.city.lat, weather_data.city.lon
+            icon_code = weather_data.current.icon
+            icon_future = None
+            if icon_loader is not None:
+                icon_future = submit_in_context(timed, timings, "icon", icon_loader, icon_code)
+            air_quality_future = submit_in_context(timed, timings, "air_quality", get_air_quality_data, api_key, lat, lon)
+            uv_index_future = submit_in_context(timed, timings, "uv_index", get_uv_index_data, api_key, lat, lon)
+            result = (
+                weather_data,
+                air_quality_future.result(),
+                uv_index_future.result(),
+                icon_future.result() if icon_future is not None else None,
+            )
+            if result[3] is not None and icon_saving is not None:
+                timings["icon_saved"] = icon_saving(icon_code, timings["icon"])
+    timings["total"] = time.perf_counter() - start
+    if SHOW_TIMINGS:
+        print_timings(city_name, timings)
+        print(f"[cache] {response_cache.stats}")
+        print(f"[single-flight] {single_flight.stats}")
+    return result, timings
+
+
+def print_timings(city_name, timings):
+    stages = ", ".join(f"{stage}={seconds * 1000:.0f}ms" for stage, seconds in timings.items())
+    print(f"[timings] {city_name}: {stages}")
+
+
+def summarize_weather(forecast, air_quality, uv_index):
+    # The handful of values the app shows, from the three records
+    city = forecast.city
+    current = forecast.current
+
+    low_c, high_c = forecast.columns.temperature_range()
+    return {
+        "city_id": city.id,
+        "city": city.name,
+        "country": city.country,
+        "timezone": city.timezone,
+        "local_time": city_local_time(city.timezone),
+        "temp_c": current.temp,
+        "high_c": high_c,
+        "low_c": low_c,
+        "humidity": current.humidity,
+        "pressure": current.pressure,
+        "wind_speed": current.wind_speed,
+        "description": current.description,
+        "icon": current.icon,
+        "sunrise": city.sunrise,
+        "sunset": city.sunset,
+        "uv_index": uv_index.value if uv_index else None,
+        "aqi": air_quality.aqi if air_quality else None,
+        "daily": summarize_days(forecast.columns),
+    }
+
+
+def city_local_time(timezone_offset):
+    # Local time from the city's timezone offset (seconds east of UTC)
+    city_time = datetime.datetime.now(datetime.UTC) + datetime.timedelta(seconds=timezone_offset)
+    return city_time.strftime('%Y-%m-%d %H:%M:%S')
+
+
+def celsius_to_fahrenheit(celsius):
+    return (celsius * 9/5) + 32
@@ -0,0 +1,247 @@
+import codecs
+import json
+import re
+from array import array
+from typing import NamedTuple
+
+from forecast_summary import ForecastColumns
+
+# Compact typed records for the OpenWeatherMap responses the app uses, parsed
+# straight from the response body as it streams in. Only the fields the app
+# shows are kept: a /forecast response is about 16 KB of JSON and well over
+# 100 KB once decoded into dicts, while a Forecast record is a few small tuples
+# plus the typed columns from forecast_summary.
+#
+# The big arrays (the 40 forecast slots, the /find matches) are never decoded
+# as a whole: each element is decoded on its own, projected, and dropped, so
+# only one element's dicts are alive at a time however long the response is.
+
+STREAM_CHUNK_SIZE = 16 * 1024
+
+WHITESPACE = re.compile(r"[ \t\n\r]*")
+DECODER = json.JSONDecoder()
+VALUE_END = frozenset(" \t\n\r,:]}")
+
+
+class City(NamedTuple):
+    id: int
+    name: str
+    country: str
+    timezone: int  # seconds east of UTC
+    lat: float
+    lon: float
+    sunrise: int
+    sunset: int
+
+
+class Conditions(NamedTuple):
+    # The first forecast slot, shown as the current weather
+    temp: float
+    humidity: float
+    pressure: float
+    wind_speed: float
+    description: str
+    icon: str
+
+
+class Forecast(NamedTuple):
+    city: City
+    current: Conditions
+    columns: ForecastColumns  # every slot, for the high/low and the per-day outlook
+
+
+class CityMatches(NamedTuple):
+    ids: tuple  # best match first
+
+
+class AirQuality(NamedTuple):
+    aqi: int  # 1 (good) .. 5 (very poor)
+    dt: int
+
+
+class UVIndex(NamedTuple):
+    value: float
+    date: int
+
+
+class JSONStream:
+    # Just enough of a pull parser over an iterable of byte chunks to walk the
+    # top level of an object; values themselves are decoded by json.JSONDecoder
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self.buffer = ""
+        self.pos = 0
+        self.done = False
+
+    def _more(self):
+        # Append the next chunk to the buffer; False once the input is exhausted
+        if self.done:
+            return False
+        for chunk in self._chunks:
+            text = self._decoder.decode(chunk)
+            if text:
+                self.buffer = self.buffer[self.pos:] + text
+                self.pos = 0
+                return True
+        self.done = True
+        tail = self._decoder.decode(b"", final=True)
+        if tail:
+            self.buffer = self.buffer[self.pos:] + tail
+            self.pos = 0
+        return bool(tail)
+
+    def peek(self):
+        # The next non-whitespace character, or "" at the end of the input
+        if self.pos < len(self.buffer) and self.buffer[self.pos] not in " \t\n\r":
+            return self.buffer[self.pos]
+        while True:
+            self.pos = WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._more():
+                return ""
+
+    def expect(self, char):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expecting {char!r}, found {found or 'end of data'!r}")
+        self.pos += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = DECODER.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if self._more():
+                    continue
+                raise
+            # A number cut off by the end of a chunk ("1." of "1.25") decodes fine,
+            # so a value only counts once whatever follows it is in the buffer
+            if end < len(self.buffer) and self.buffer[end] in VALUE_END or not self._more():
+                self.pos = end
+                return value
+
+
+def stream_object(chunks, on_item):
+    # Decode a JSON object from `chunks`. Members named in `on_item` must be
+    # arrays: their elements are passed one at a time to on_item[name] instead
+    # of being kept. All other members are returned as a dict.
+    stream = JSONStream(chunks)
+    members = {}
+    stream.expect("{")
+    if stream.peek() == "}":
+        stream.pos += 1
+    else:
+        while True:
+            key = stream.value()
+            if not isinstance(key, str):
+                raise ValueError("Expecting property name")
+            stream.expect(":")
+            if key in on_item:
+                stream_array(stream, on_item[key])
+            else:
+                members[key] = stream.value()
+            if stream.peek() == ",":
+                stream.pos += 1
+                continue
+            stream.expect("}")
+            break
+    if stream.peek():
+        raise ValueError("Extra data after the JSON object")
+    return members
+
+
+def stream_array(stream, callback):
+    stream.expect("[")
+    if stream.peek() == "]":
+        stream.pos += 1
+        return
+    while True:
+        callback(stream.value())
+        if stream.peek() == ",":
+            stream.pos += 1
+            continue
+        stream.expect("]")
+        return
+
+
+def parse_find(chunks):
+    ids = []
+    stream_object(chunks, {"list": lambda match: ids.append(match['id'])})
+    return CityMatches(tuple(ids))
+
+
+def parse_forecast(chunks):
+    columns = ForecastColumns.empty()
+    first = []
+
+    def add_slot(item):
+        if not first:
+            first.append(item)
+        columns.append(item)
+
+    members = stream_object(chunks, {"list": add_slot})
+    if not first:
+        raise ValueError("Forecast has no entries")
+    city = members['city']
+    columns.timezone = city.get('timezone', 0)
+    columns.sort()
+    current = first[0]
+    return Forecast(
+        City(city['id'], city['name'], city.get('country'), city.get('timezone', 0),
+             city['coord']['lat'], city['coord']['lon'], city.get('sunrise'), city.get('sunset')),
+        Conditions(current['main']['temp'], current['main']['humidity'], current['main']['pressure'],
+                   current['wind']['speed'], current['weather'][0]['description'], current['weather'][0]['icon']),
+        columns,
+    )
+
+
+def parse_air_quality(chunks):
+    readings = []
+    stream_object(chunks, {"list": readings.append})
+    return AirQuality(readings[0]['main']['aqi'], readings[0].get('dt'))
+
+
+def parse_uv_index(chunks):
+    members = stream_object(chunks, {})
+    return UVIndex(members['value'], members.get('date'))
+
+
+RESPONSE_PARSERS = {
+    "find": parse_find,
+    "forecast": parse_forecast,
+    "air_pollution": parse_air_quality,
+    "uvi": parse_uv_index,
+}
+
+
+def parse_response(endpoint, chunks):
+    return RESPONSE_PARSERS[endpoint](chunks)
+
+
+def encode_forecast(forecast):
+    columns = forecast.columns
+    return [list(forecast.city), list(forecast.current),
+            [column.tolist() for column in (columns.dt, columns.temp, columns.humidity, columns.wind, columns.pop)]]
+
+
+def decode_forecast(value):
+    city, current, (dt, temp, humidity, wind, pop) = value
+    city = City(*city)
+    columns = ForecastColumns(array('q', dt), array('d', temp), array('d', humidity), array('d', wind),
+                              array('d', pop), city.timezone)
+    return Forecast(city, Conditions(*current), columns)
+
+
+# endpoint -> (encode, decode) between a record and plain JSON, for ResponseCache's SQLite copy.
+# Bump RECORD_FORMAT whenever an encoding changes so files in the old layout are dropped.
+RECORD_FORMAT = 1
+RECORD_CODECS = {
+    "find": (lambda matches: list(matches.ids), lambda ids: CityMatches(tuple(ids))),
+    "forecast": (encode_forecast, decode_forecast),
+    "air_pollution": (list, lambda value: AirQuality(*value)),
+    "uvi": (list, lambda value: UVIndex(*value)),
+}